@@ -1,56 +1,117 @@
+import base64
+import binascii
+import gzip
+import hashlib
 import logging
-import re
-import unicodedata
 from pathlib import Path
-from typing import Any, List, Optional
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 
-from fastapi import APIRouter, HTTPException, Query, Response
+import orjson
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse
 from starlette.concurrency import run_in_threadpool
 
-from app.models.db import get_connection, query_airports, get_airport_by_slug
+from app.models.db import AIRPORT_FIELDS, get_airport_by_slug, get_connection, query_airports
 
 
 router = APIRouter(prefix="/api")
 
+# Number of airports returned when neither 'limit' nor 'size' is given
+DEFAULT_LIMIT = 50
 
-def slugify(text: Optional[str], fallback: Optional[str] = None) -> str:
-    """Create a URL-friendly slug from a string.
 
-    - Normalize unicode and strip accents
-    - Lowercase
-    - Replace non-alphanumeric with hyphens
-    - Collapse multiple hyphens and trim
+def encode_cursor(airport_id: int) -> str:
+    """Encode an airport id as an opaque pagination cursor."""
+    return base64.urlsafe_b64encode(str(airport_id).encode("ascii")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Optional[int]:
+    """Decode a cursor produced by encode_cursor; empty means start from the beginning.
+
+    Raises ValueError for malformed cursors, including negative ids (which
+    encode_cursor never produces).
     """
-    if not text or not isinstance(text, str):
-        return (fallback or "").strip().lower()
-    # Normalize and strip accents
-    norm = unicodedata.normalize("NFKD", text)
-    norm = "".join(c for c in norm if not unicodedata.combining(c))
-    # Lowercase and replace non-alphanum with hyphen
-    norm = norm.lower()
-    norm = re.sub(r"[^a-z0-9]+", "-", norm)
-    # Collapse and trim hyphens
-    norm = re.sub(r"-+", "-", norm).strip("-")
-    if not norm and fallback:
-        return fallback.strip().lower()
-    return norm
-
-
-def airport_slug(a: dict[str, Any]) -> str:
-    name = a.get("name")
-    ident = a.get("ident") or a.get("icao_code") or a.get("iata_code")
-    fid = str(a.get("id")) if a.get("id") is not None else None
-    slug = slugify(name, fallback=ident or fid or "")
-    return slug
-
-
-def attach_slugs(items: List[dict[str, Any]]) -> None:
-    for a in items:
-        if "slug" not in a or not a.get("slug"):
-            a["slug"] = airport_slug(a)
-
-
-@router.get("/airports", summary="Combined OurAirports data as JSON", responses={
+    cursor = cursor.strip()
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        airport_id = int(raw.decode("ascii"))
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise ValueError(f"Invalid cursor: {cursor}") from exc
+    if airport_id < 0:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return airport_id
+
+
+class DefaultPayload(NamedTuple):
+    """Pre-serialized body for the default (unfiltered) /api/airports request."""
+
+    etag: str
+    body: bytes
+    body_gzip: bytes
+
+
+def _query(**kwargs: Any) -> Tuple[List[dict[str, Any]], Optional[int]]:
+    # Runs in a worker thread, which uses its own pooled connection
+    return query_airports(get_connection(), **kwargs)
+
+
+def build_default_payload() -> DefaultPayload:
+    """Serialize and gzip the default airports list once (called from lifespan)."""
+    items, _ = _query(limit=DEFAULT_LIMIT)
+    body = orjson.dumps(items)
+    # Weak: the gzip and identity bodies share it, so they are only
+    # semantically (not byte-for-byte) equivalent
+    etag = 'W/"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+    return DefaultPayload(etag=etag, body=body, body_gzip=gzip.compress(body))
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """Whether an Accept-Encoding header allows gzip (an explicit q=0 refuses it)."""
+    qualities: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value.strip())
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    return qualities.get("gzip", qualities.get("*", 0.0)) > 0
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header (a tag list or "*") against etag."""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == opaque:
+            return True
+    return False
+
+
+def _default_payload_response(request: Request, payload: DefaultPayload) -> Response:
+    headers = {"ETag": payload.etag, "Vary": "Accept-Encoding"}
+    if _etag_matches(request.headers.get("if-none-match", ""), payload.etag):
+        return Response(status_code=304, headers=headers)
+    if _accepts_gzip(request.headers.get("accept-encoding", "")):
+        headers["Content-Encoding"] = "gzip"
+        return Response(payload.body_gzip, media_type="application/json", headers=headers)
+    return Response(payload.body, media_type="application/json", headers=headers)
+
+
+@router.get("/airports", response_model=None, summary="Combined OurAirports data as JSON", responses={
     200: {
         "description": "A list of airports",
         "content": {
@@ -108,7 +169,7 @@ def attach_slugs(items: List[dict[str, Any]]) -> None:
     },
 })
 async def get_airporsts_informations(
-    response: Response,
+    request: Request,
     limit: Optional[int] = Query(
         default=None,
         ge=1,
@@ -124,8 +185,11 @@ async def get_airporsts_informations(
     iso_country: Optional[str] = Query(default=None, description="Filter by ISO country code (e.g., US)"),
     iso_region: Optional[str] = Query(default=None, description="Filter by ISO region code (e.g., US-NY)"),
     airport_type: Optional[str] = Query(default=None, alias="type", description="Filter by airport type (e.g., large_airport, small_airport, heliport)"),
-    q: Optional[str] = Query(default=None, description="Unified search across name, codes, municipality, and country/region"),
-) -> List[dict[str, Any]]:
+    q: Optional[str] = Query(default=None, description="Unified search across name, codes, municipality, and country/region; every word must start a word in one of them (prefix, not substring match)"),
+    q_prefix: bool = Query(default=False, description="Match 'q' as a prefix of codes, municipality and country/region (index range scan)"),
+    fields: Optional[str] = Query(default=None, description="Comma-separated flat fields to return (e.g. iata_code,name,municipality); skips the full airport record"),
+    cursor: Optional[str] = Query(default=None, description="Cursor for keyset pagination ordered by id; pass an empty value to start, then the X-Next-Cursor header of the previous response"),
+) -> Response:
     """Run the combine_data script logic and return the JSON array.
 
     Reads CSVs from impoted_data/ and returns the combined airports with nested
@@ -140,17 +204,71 @@ async def get_airporsts_informations(
     - iso_country: ISO country code
     - iso_region: ISO region code
     - type: airport type
+    - q: unified search; with q_prefix, values starting with q
+
+    fields selects flat columns (slug, id, ident, name, iata_code, icao_code,
+    municipality, iso_country, iso_region, type, country_name, region_name)
+    instead of the full nested record; in cursor mode id is always included.
 
     Limit is applied after filtering.
+
+    Passing cursor switches to keyset pagination: results are ordered by id,
+    'size' (or 'limit') bounds the page and X-Next-Cursor points to the next
+    page. No total count is computed in this mode.
+
+    Rows come straight from the DB layer, so they are serialized with orjson
+    and returned as-is instead of going through response validation. The
+    default request (no filters, limit, size or cursor) is served from a
+    payload prebuilt at startup, with ETag/If-None-Match support.
     """
+    unfiltered = all(
+        v is None
+        for v in (iata, icao, municipality, country_name, region_name, iso_country, iso_region, airport_type, q)
+    )
+    field_list = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    if unfiltered and limit is None and page_size is None and cursor is None and not field_list:
+        payload = getattr(request.app.state, "default_airports", None)
+        if payload is not None:
+            return _default_payload_response(request, payload)
+    if cursor is not None:
+        try:
+            after_id = decode_cursor(cursor)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+    if field_list:
+        unknown = [f for f in field_list if f not in AIRPORT_FIELDS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+        if cursor is not None and "id" not in field_list:
+            # The next cursor is taken from the last item's id
+            field_list.append("id")
     try:
+        if cursor is not None:
+            items, headers = await run_in_threadpool(
+                _keyset_page,
+                after_id=after_id,
+                size=page_size or limit or DEFAULT_LIMIT,
+                iata=iata,
+                icao=icao,
+                municipality=municipality,
+                country_name=country_name,
+                region_name=region_name,
+                iso_country=iso_country,
+                iso_region=iso_region,
+                airport_type=airport_type,
+                q=q,
+                q_prefix=q_prefix,
+                fields=field_list,
+            )
+            return ORJSONResponse(items, headers=headers)
         # Query from SQLite with filters and pagination
         has_pagination = page_size is not None
         # Default to 50 results when not paginating and no explicit limit provided
-        effective_limit = None if has_pagination else (limit if limit is not None else 50)
-        conn = get_connection()
-        items, total = query_airports(
-            conn,
+        effective_limit = None if has_pagination else (limit if limit is not None else DEFAULT_LIMIT)
+        # Total computed once at startup (see lifespan); only valid without filters
+        known_total = getattr(request.app.state, "airport_total", None) if unfiltered else None
+        items, total = await run_in_threadpool(
+            _query,
             iata=iata,
             icao=icao,
             municipality=municipality,
@@ -160,21 +278,23 @@ async def get_airporsts_informations(
             iso_region=iso_region,
             airport_type=airport_type,
             q=q,
+            q_prefix=q_prefix,
             limit=effective_limit,
             page=page if has_pagination else None,
             page_size=page_size,
+            count_total=known_total is None,
+            fields=field_list,
         )
+        headers: Dict[str, str] = {}
         if has_pagination:
-            total_val = total or 0
+            total_val = (known_total if known_total is not None else total) or 0
             size = page_size or 1
             total_pages = (total_val + size - 1) // size if size > 0 else 0
-            response.headers["X-Total-Count"] = str(total_val)
-            response.headers["X-Page"] = str(page)
-            response.headers["X-Page-Size"] = str(size)
-            response.headers["X-Total-Pages"] = str(total_pages)
-            return items  # type: ignore[return-value]
-        else:
-            return items  # type: ignore[return-value]
+            headers["X-Total-Count"] = str(total_val)
+            headers["X-Page"] = str(page)
+            headers["X-Page-Size"] = str(size)
+            headers["X-Total-Pages"] = str(total_pages)
+        return ORJSONResponse(items, headers=headers)
     except FileNotFoundError as exc:
         raise HTTPException(status_code=503, detail=f"Dataset not ready: {exc}")
     except Exception as exc:  # noqa: BLE001
@@ -184,7 +304,15 @@ async def get_airporsts_informations(
         raise HTTPException(status_code=500, detail="Failed to generate combined data")
 
 
-@router.get("/airports/{slug}", summary="Airport details by slug", responses={
+def _keyset_page(*, after_id: Optional[int], size: int, **filters: Any) -> Tuple[List[dict[str, Any]], Dict[str, str]]:
+    items, _ = _query(**filters, limit=size, after_id=after_id, keyset=True)
+    headers = {"X-Page-Size": str(size)}
+    if len(items) == size and items[-1].get("id") is not None:
+        headers["X-Next-Cursor"] = encode_cursor(items[-1]["id"])
+    return items, headers
+
+
+@router.get("/airports/{slug}", response_model=None, summary="Airport details by slug", responses={
     200: {
         "description": "Airport details",
         "content": {
@@ -227,13 +355,12 @@ async def get_airporsts_informations(
         "content": {"application/json": {"example": {"detail": "Dataset not ready: <reason>"}}},
     },
 })
-async def get_airport_details(slug: str) -> dict[str, Any]:
+async def get_airport_details(slug: str) -> Response:
     try:
-        conn = get_connection()
-        target = get_airport_by_slug(conn, slug)
+        target = await run_in_threadpool(get_airport_by_slug, slug)
         if target is None:
             raise HTTPException(status_code=404, detail="Airport not found")
-        return target  # type: ignore[return-value]
+        return ORJSONResponse(target)
     except FileNotFoundError as exc:
         raise HTTPException(status_code=503, detail=f"Dataset not ready: {exc}")
     except HTTPException:
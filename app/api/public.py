@@ -1,18 +1,56 @@
+import asyncio
+import time
+import weakref
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
 from fastapi import APIRouter, Request, Response
+from starlette.concurrency import run_in_threadpool
 from starlette.responses import PlainTextResponse
-from datetime import datetime
+from datetime import datetime, timezone
 
-from app.models.db import get_connection, get_airport_by_slug
+from app.models.db import get_airport_by_slug, open_connection
 
 router = APIRouter()
 
+# Sitemap XML cached per base URL: base -> (built_at, xml bytes). The base
+# comes from the Host header, so only the most recently used few are kept
+_SITEMAP_TTL_SECONDS = 3600
+_SITEMAP_CACHE_SIZE = 4
+_SITEMAP_CACHE: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+# One rebuild lock per event loop, created on first use: on Python < 3.10 an
+# asyncio.Lock binds to the loop current at construction, so an import-time
+# lock breaks under the server's loop or a second test client's loop
+_SITEMAP_LOCKS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = weakref.WeakKeyDictionary()
+_SITEMAP_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+)
+_SITEMAP_URL_TEMPLATE = (
+    "  <url><loc>{loc}</loc><lastmod>{now}</lastmod>"
+    "<changefreq>daily</changefreq><priority>0.7</priority></url>\n"
+)
+_SITEMAP_FOOTER = "</urlset>"
+_SITEMAP_PAGES = ("/", "/airports", "/map", "/about", "/api-info")
+_SITEMAP_BATCH_SIZE = 500
+
 # Try to configure Jinja2 templates; gracefully fall back if jinja2 is unavailable
 try:  # pragma: no cover - exercised in environments without Jinja2
+    import jinja2
     from starlette.templating import Jinja2Templates
 
+    from app.core.config import get_settings
+
     _templates_dir = Path(__file__).resolve().parents[1] / "templates"
-    templates = Jinja2Templates(directory=str(_templates_dir))
+    # Templates don't change at runtime in production; skip the per-render mtime checks
+    _env = jinja2.Environment(
+        loader=jinja2.FileSystemLoader(str(_templates_dir)),
+        autoescape=True,
+        auto_reload=get_settings().environment != "production",
+    )
+    templates = Jinja2Templates(env=_env)
     _has_jinja = True
 except Exception:  # noqa: BLE001
     templates = None  # type: ignore[assignment]
@@ -20,8 +58,10 @@ except Exception:  # noqa: BLE001
     _has_jinja = False
 
 
+@lru_cache(maxsize=32)
 def _render_without_jinja(template_name: str) -> str:
-    # Minimal include replacement for our header and head includes
+    # Minimal include replacement for our header and head includes.
+    # Cached per template: files are immutable at runtime (restart to pick up edits).
     html = (_templates_dir / template_name).read_text(encoding="utf-8")
     replacements = [
         ("{% include 'partials/header.html' %}", _templates_dir / "partials" / "header.html"),
@@ -95,33 +135,79 @@ Sitemap: {base}/sitemap.xml
     return PlainTextResponse(content=body, media_type="text/plain; charset=utf-8")
 
 
-@router.get("/sitemap.xml", include_in_schema=False)
-async def sitemap_xml(request: Request):
-    base = str(request.base_url).rstrip("/")
-    urls = ["/", "/airports", "/map", "/about", "/api-info"]
-    # Try to include airport pages
+def _iter_sitemap(base: str) -> Iterator[bytes]:
+    """Yield the sitemap XML in chunks, reading airport slugs in batches."""
+    now = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    pages = "".join(_SITEMAP_URL_TEMPLATE.format(loc=f"{base}{path}", now=now) for path in _SITEMAP_PAGES)
+    yield (_SITEMAP_HEADER + pages).encode("utf-8")
+    # Try to include airport pages. The generator may be resumed from
+    # different threads, so it uses its own connection rather than the
+    # per-thread pooled one
+    conn = None
     try:
-        conn = get_connection()
+        conn = open_connection()
         cur = conn.execute("SELECT slug FROM airports ORDER BY slug LIMIT 10000;")
-        urls += [f"/airports/{row[0]}" for row in cur.fetchall() if row and row[0]]
+        while True:
+            rows = cur.fetchmany(_SITEMAP_BATCH_SIZE)
+            if not rows:
+                break
+            yield "".join(
+                _SITEMAP_URL_TEMPLATE.format(loc=f"{base}/airports/{row[0]}", now=now)
+                for row in rows
+                if row and row[0]
+            ).encode("utf-8")
     except Exception:
         pass
-    now = datetime.utcnow().strftime("%Y-%m-%d")
-    # Build XML
-    parts = [
-        '<?xml version="1.0" encoding="UTF-8"?>',
-        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">',
-    ]
-    for path in urls:
-        loc = f"{base}{path}"
-        parts.append("  <url>")
-        parts.append(f"    <loc>{loc}</loc>")
-        parts.append(f"    <lastmod>{now}</lastmod>")
-        parts.append("    <changefreq>daily</changefreq>")
-        parts.append("    <priority>0.7</priority>")
-        parts.append("  </url>")
-    parts.append("</urlset>")
-    xml = "\n".join(parts)
+    finally:
+        if conn is not None:
+            conn.close()
+    yield _SITEMAP_FOOTER.encode("utf-8")
+
+
+def _cached_sitemap(base: str) -> Optional[bytes]:
+    entry = _SITEMAP_CACHE.get(base)
+    if entry and time.monotonic() - entry[0] < _SITEMAP_TTL_SECONDS:
+        _SITEMAP_CACHE.move_to_end(base)
+        return entry[1]
+    return None
+
+
+def _store_sitemap(base: str, xml: bytes) -> None:
+    _SITEMAP_CACHE[base] = (time.monotonic(), xml)
+    _SITEMAP_CACHE.move_to_end(base)
+    while len(_SITEMAP_CACHE) > _SITEMAP_CACHE_SIZE:
+        _SITEMAP_CACHE.popitem(last=False)
+
+
+def _build_sitemap(base: str) -> bytes:
+    return b"".join(_iter_sitemap(base))
+
+
+def _sitemap_lock() -> asyncio.Lock:
+    loop = asyncio.get_running_loop()
+    lock = _SITEMAP_LOCKS.get(loop)
+    if lock is None:
+        lock = _SITEMAP_LOCKS[loop] = asyncio.Lock()
+    return lock
+
+
+async def _get_sitemap(base: str) -> bytes:
+    # Only one coroutine rebuilds; the others wait and reuse its result. The
+    # lock covers the build only, never a client's (possibly slow) download
+    async with _sitemap_lock():
+        xml = _cached_sitemap(base)
+        if xml is None:
+            xml = await run_in_threadpool(_build_sitemap, base)
+            _store_sitemap(base, xml)
+    return xml
+
+
+@router.get("/sitemap.xml", include_in_schema=False)
+async def sitemap_xml(request: Request):
+    base = str(request.base_url).rstrip("/")
+    xml = _cached_sitemap(base)
+    if xml is None:
+        xml = await _get_sitemap(base)
     return Response(content=xml, media_type="application/xml")
 
 
@@ -130,8 +216,7 @@ async def airport_details_page(request: Request, slug: str):
     # Try to enrich with server-side airport data for SEO (JSON-LD, meta tags)
     airport = None
     try:
-        conn = get_connection()
-        airport = get_airport_by_slug(conn, slug)
+        airport = await run_in_threadpool(get_airport_by_slug, slug)
     except Exception:
         airport = None
     if _has_jinja and templates is not None:
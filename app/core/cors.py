@@ -0,0 +1,49 @@
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+_ALLOW_ORIGIN = (b"access-control-allow-origin", b"*")
+_PREFLIGHT_HEADERS = [
+    _ALLOW_ORIGIN,
+    (b"access-control-allow-methods", b"DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT"),
+    (b"access-control-max-age", b"600"),
+]
+
+
+class SimpleWildcardCORSMiddleware:
+    """CORS for a fully open API (``allow_origins=["*"]``, no credentials).
+
+    Equivalent to Starlette's CORSMiddleware for that configuration, without the
+    per-request Origin parsing and header rewriting: every response simply gets
+    ``Access-Control-Allow-Origin: *`` and preflights are answered directly.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] == "OPTIONS":
+            request_headers = None
+            is_preflight = False
+            for name, value in scope["headers"]:
+                if name == b"access-control-request-method":
+                    is_preflight = True
+                elif name == b"access-control-request-headers":
+                    request_headers = value
+            if is_preflight:
+                headers = list(_PREFLIGHT_HEADERS)
+                if request_headers:
+                    # allow_headers=["*"]: echo back whatever the browser asked for
+                    headers.append((b"access-control-allow-headers", request_headers))
+                await send({"type": "http.response.start", "status": 204, "headers": headers})
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+        async def send_with_cors(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", []).append(_ALLOW_ORIGIN)
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
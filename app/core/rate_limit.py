@@ -1,22 +1,29 @@
 import time
 import threading
-from typing import Callable, Optional
+from typing import Optional
 
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import JSONResponse, Response
+from starlette.datastructures import MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+# Number of lock/counter shards (power of two so the index is a cheap mask)
+_NUM_SHARDS = 64
+_MAX_KEYS_PER_SHARD = 1024
 
-class RateLimiterMiddleware(BaseHTTPMiddleware):
+
+class RateLimiterMiddleware:
     """Simple in-memory fixed-window rate limiter per client IP.
 
+    Implemented as a plain ASGI middleware (rather than BaseHTTPMiddleware) so
+    requests don't pay for an extra task group and memory stream.
+
     This is a lightweight solution suitable for single-process deployments and tests.
     For multi-process or distributed deployments, use a shared store (Redis) instead.
     """
 
     def __init__(
         self,
-        app,
+        app: ASGIApp,
         *,
         enabled: bool = True,
         limit: int = 120,
@@ -24,74 +31,96 @@ class RateLimiterMiddleware(BaseHTTPMiddleware):
         scope_prefix: str = "/api",
         header_client_ip: Optional[str] = None,
     ) -> None:
-        super().__init__(app)
+        self.app = app
         self.enabled = enabled
         self.limit = max(1, int(limit))
         self.window = max(1, int(window_seconds))
         self.scope_prefix = scope_prefix or "/api"
         self.header_client_ip = (header_client_ip or "").strip() or None
-        # key: (ip, window_start) -> count
-        self._counts: dict[tuple[str, int], int] = {}
-        self._lock = threading.Lock()
+        # Frozen per-request values: the client IP header in ASGI's raw form
+        # (lowercased bytes) and the constant limit header value
+        self._hdr_bytes = self.header_client_ip.lower().encode("latin-1") if self.header_client_ip else None
+        self._limit_str = str(self.limit)
+        # Power-of-two windows are bucketed with a bit mask instead of a modulo
+        self._mask = ~(self.window - 1) if self.window & (self.window - 1) == 0 else None
+        # Counters are sharded by client IP so concurrent requests from different
+        # clients don't contend on a single lock. Each shard maps
+        # ip -> [window_start, count]; stale windows are overwritten lazily.
+        self._shards: list[dict[str, list[int]]] = [{} for _ in range(_NUM_SHARDS)]
+        self._locks = [threading.Lock() for _ in range(_NUM_SHARDS)]
 
-    def _client_id(self, request: Request) -> str:
+    def _client_id(self, scope: Scope) -> str:
         # If a forwarding header is configured, trust first IP in list
-        if self.header_client_ip:
-            hdr = request.headers.get(self.header_client_ip)
-            if hdr:
-                return hdr.split(",")[0].strip() or "anonymous"
-        client = request.client
-        return (client.host if client else "anonymous") or "anonymous"
-
-    def _now_window(self) -> int:
-        now = int(time.time())
+        if self._hdr_bytes is not None:
+            for name, value in scope["headers"]:
+                if name == self._hdr_bytes:
+                    forwarded = value.decode("latin-1").split(",")[0].strip()
+                    if forwarded:
+                        return forwarded
+                    # A blank header falls back to the peer address below
+                    break
+        client = scope.get("client")
+        return (client[0] if client else "anonymous") or "anonymous"
+
+    def _window_start(self, now: int) -> int:
+        if self._mask is not None:
+            return now & self._mask
         return now - (now % self.window)
 
     def _inc(self, ip: str, window_start: int) -> int:
-        key = (ip, window_start)
-        with self._lock:
-            # Clean old windows occasionally to avoid unbounded growth
-            # Only when dict grows beyond a small threshold
-            if len(self._counts) > 1024:
-                to_del = [k for k in self._counts if k[1] < window_start]
-                for k in to_del:
-                    self._counts.pop(k, None)
-            cnt = self._counts.get(key, 0) + 1
-            self._counts[key] = cnt
-            return cnt
-
-    async def dispatch(self, request: Request, call_next: Callable[[Request], Response]) -> Response:  # type: ignore[override]
-        if not self.enabled:
-            return await call_next(request)
+        idx = hash(ip) & (_NUM_SHARDS - 1)
+        shard = self._shards[idx]
+        with self._locks[idx]:
+            entry = shard.get(ip)
+            if entry is None or entry[0] != window_start:
+                # Only this shard is swept, and only when it grows large
+                if entry is None and len(shard) >= _MAX_KEYS_PER_SHARD:
+                    for k in [k for k, v in shard.items() if v[0] != window_start]:
+                        del shard[k]
+                shard[ip] = [window_start, 1]
+                return 1
+            entry[1] += 1
+            return entry[1]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not self.enabled or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
         # Scope only to matching path prefix
-        path = request.url.path or ""
+        path = scope.get("path") or ""
         if not path.startswith(self.scope_prefix):
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
 
-        ip = self._client_id(request)
-        window_start = self._now_window()
+        ip = self._client_id(scope)
+        # One clock read per request; window and reset time both derive from it
+        now = int(time.monotonic())
+        window_start = self._window_start(now)
         count = self._inc(ip, window_start)
         remaining = max(0, self.limit - count)
-        reset_in = self.window - (int(time.time()) - window_start)
+        reset_in = self.window - (now - window_start)
 
         if count > self.limit:
             # Too many requests
             headers = {
-                "X-RateLimit-Limit": str(self.limit),
+                "X-RateLimit-Limit": self._limit_str,
                 "X-RateLimit-Remaining": "0",
                 "Retry-After": str(max(1, reset_in)),
             }
-            return JSONResponse(
+            response = JSONResponse(
                 {"detail": "Too Many Requests"}, status_code=429, headers=headers
             )
+            await response(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Attach headers for visibility
+                headers = MutableHeaders(scope=message)
+                headers["X-RateLimit-Limit"] = self._limit_str
+                headers["X-RateLimit-Remaining"] = str(remaining)
+            await send(message)
 
         # Proceed with request
-        response = await call_next(request)
-        try:
-            # Attach headers for visibility
-            response.headers["X-RateLimit-Limit"] = str(self.limit)
-            response.headers["X-RateLimit-Remaining"] = str(remaining)
-        except Exception:
-            pass
-        return response
+        await self.app(scope, receive, send_with_headers)
@@ -0,0 +1 @@
+"""Domain logic for building the airport dataset."""
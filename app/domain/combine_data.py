@@ -0,0 +1,289 @@
+"""Combine the OurAirports CSVs into nested airport dicts.
+
+Used by populate_db_from_files (streamed into SQLite) and by
+scripts/get_all_flight_info.py (written to airports_combined.json).
+"""
+import csv
+import logging
+import os
+from collections import defaultdict, deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import chain, islice
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _safe_int(v: Any) -> Optional[int]:
+    try:
+        if v is None:
+            return None
+        s = str(v).strip()
+        if s == "":
+            return None
+        return int(float(s))  # handle values like '123.0'
+    except Exception:
+        return None
+
+
+def _safe_float(v: Any) -> Optional[float]:
+    try:
+        if v is None:
+            return None
+        s = str(v).strip()
+        if s == "":
+            return None
+        return float(s)
+    except Exception:
+        return None
+
+
+def _read_csv_columns(path: Path, columns: Sequence[str]) -> Iterator[Tuple[str, ...]]:
+    """Yield the stripped values of the given columns, by position.
+
+    Columns resolve to indices once from the header; only the kept fields
+    are stripped and no per-row dict is built. Missing values yield "".
+    """
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        idx = {name: i for i, name in enumerate(header)}
+        positions = [idx.get(c, -1) for c in columns]
+        for row in reader:
+            n = len(row)
+            yield tuple(row[i].strip() if 0 <= i < n else "" for i in positions)
+
+
+def _load_code_names(path: Path) -> Dict[str, Dict[str, Any]]:
+    """Read a code/name lookup CSV (countries.csv, regions.csv); empty if absent or unreadable."""
+    by_code: Dict[str, Dict[str, Any]] = {}
+    if path.exists():
+        try:
+            for code, name in _read_csv_columns(path, ("code", "name")):
+                if code:
+                    by_code[code] = {"code": code, "name": name}
+        except Exception as exc:
+            logger.warning("Failed to read %s: %s", path.name, exc)
+    return by_code
+
+
+# Comment fields carried into the combined output; the airport_ident/airport_ref
+# grouping keys are dropped since each comment is nested under its airport
+COMMENT_FIELDS: Tuple[str, ...] = ("id", "date", "member_nickname", "subject", "body")
+
+
+def _load_comments(path: Path) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, List[Dict[str, Any]]]]:
+    """Group airport-comments.csv rows by airport ident and by airport ref."""
+    comments_by_ident: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    comments_by_ref: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    if path.exists():
+        try:
+            columns = ("airport_ident", "airport_ref") + COMMENT_FIELDS
+            for ident, ref, *values in _read_csv_columns(path, columns):
+                cm = dict(zip(COMMENT_FIELDS, values))
+                if ident:
+                    comments_by_ident[ident].append(cm)
+                if ref:
+                    comments_by_ref[ref].append(cm)
+        except Exception as exc:
+            logger.warning("Failed to read airport-comments.csv: %s", exc)
+    return comments_by_ident, comments_by_ref
+
+
+AIRPORT_COLUMNS: Tuple[str, ...] = (
+    "id",
+    "ident",
+    "type",
+    "name",
+    "latitude_deg",
+    "longitude_deg",
+    "elevation_ft",
+    "continent",
+    "iso_country",
+    "iso_region",
+    "municipality",
+    "gps_code",
+    "iata_code",
+    "icao_code",
+    "local_code",
+    "home_link",
+    "wikipedia_link",
+    "keywords",
+)
+
+# Rows per unit of work handed to a combine worker process
+COMBINE_CHUNK_SIZE = 5000
+
+# Lookup tables used by _process_chunk; set once per worker by _init_lookups
+_lookups: Tuple[Dict[str, Any], ...] = ({}, {}, {}, {})
+
+
+def _init_lookups(
+    countries_by_code: Dict[str, Dict[str, Any]],
+    regions_by_code: Dict[str, Dict[str, Any]],
+    comments_by_ident: Dict[str, List[Dict[str, Any]]],
+    comments_by_ref: Dict[str, List[Dict[str, Any]]],
+) -> None:
+    global _lookups
+    _lookups = (countries_by_code, regions_by_code, comments_by_ident, comments_by_ref)
+
+
+def _process_chunk(rows: List[Tuple[str, ...]]) -> List[Dict[str, Any]]:
+    """Build combined airport dicts for a chunk of AIRPORT_COLUMNS rows."""
+    countries_by_code, regions_by_code, comments_by_ident, comments_by_ref = _lookups
+    combined: List[Dict[str, Any]] = []
+    for row in rows:
+        try:
+            (
+                raw_id,
+                ident,
+                atype,
+                name,
+                lat,
+                lon,
+                elevation,
+                continent,
+                iso_country,
+                iso_region,
+                municipality,
+                gps_code,
+                iata_code,
+                icao_code,
+                local_code,
+                home_link,
+                wikipedia_link,
+                keywords,
+            ) = row
+            aid = _safe_int(raw_id)
+
+            a: Dict[str, Any] = {
+                "id": aid,
+                "ident": ident or None,
+                "type": atype or None,
+                "name": name or None,
+                "latitude_deg": _safe_float(lat),
+                "longitude_deg": _safe_float(lon),
+                "elevation_ft": _safe_int(elevation),
+                "continent": continent or None,
+                "iso_country": iso_country or None,
+                "iso_region": iso_region or None,
+                "municipality": municipality or None,
+                "gps_code": gps_code or None,
+                "iata_code": iata_code or None,
+                "icao_code": icao_code or None,
+                "local_code": local_code or None,
+                "home_link": home_link or None,
+                "wikipedia_link": wikipedia_link or None,
+                "keywords": keywords or None,
+            }
+
+            # Attach country/region metadata if available
+            if iso_country and iso_country in countries_by_code:
+                a["country"] = countries_by_code[iso_country]
+            if iso_region and iso_region in regions_by_code:
+                a["region"] = regions_by_code[iso_region]
+
+            # Attach comments (by ident and by ref)
+            comments: List[Dict[str, Any]] = []
+            if ident:
+                comments.extend(comments_by_ident.get(ident, []))
+            if aid is not None:
+                comments.extend(comments_by_ref.get(str(aid), []))
+            if comments:
+                a["comments"] = comments
+            else:
+                a["comments"] = []
+
+            combined.append(a)
+        except Exception as exc:  # best-effort; skip bad rows
+            logger.warning("Skipping airport row due to error: %s", exc)
+            continue
+    return combined
+
+
+def _chunks(rows: Iterable[Tuple[str, ...]], size: int) -> Iterator[List[Tuple[str, ...]]]:
+    it = iter(rows)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_combined(input_dir: Path, workers: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """Yield combined airport dicts from the OurAirports CSVs in input_dir.
+
+    Input directory is expected to contain at least airports.csv (yields
+    nothing otherwise). If countries.csv, regions.csv, and airport-comments.csv
+    are present, they are used to enrich each airport with nested
+    country/region objects and a comments list.
+
+    The lookup CSVs are read concurrently in threads, and airport rows are
+    built in chunks across a process pool of `workers` processes (default:
+    CPU count); inputs that fit in a single chunk are built in-process.
+    Airports are yielded chunk by chunk in airports.csv order, so callers can
+    stream them without holding the whole dataset.
+    """
+    airports_path = input_dir / "airports.csv"
+    countries_path = input_dir / "countries.csv"
+    regions_path = input_dir / "regions.csv"
+    comments_path = input_dir / "airport-comments.csv"
+
+    if not airports_path.exists():
+        logger.warning("airports.csv not found in %s; skipping combine.", input_dir)
+        return
+
+    # Load reference data (optional), the three files in parallel
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        countries_future = pool.submit(_load_code_names, countries_path)
+        regions_future = pool.submit(_load_code_names, regions_path)
+        comments_future = pool.submit(_load_comments, comments_path)
+        countries_by_code = countries_future.result()
+        regions_by_code = regions_future.result()
+        comments_by_ident, comments_by_ref = comments_future.result()
+    lookups = (countries_by_code, regions_by_code, comments_by_ident, comments_by_ref)
+    logger.info(
+        "Loaded lookups (countries=%d, regions=%d, comments_by_ident=%d, comments_by_ref=%d)",
+        len(countries_by_code),
+        len(regions_by_code),
+        len(comments_by_ident),
+        len(comments_by_ref),
+    )
+
+    # Chunks hold raw CSV tuples and are read lazily; at most a few chunks per
+    # worker are in flight, so memory stays bounded however large the CSV is
+    chunks = _chunks(_read_csv_columns(airports_path, AIRPORT_COLUMNS), COMBINE_CHUNK_SIZE)
+    head = list(islice(chunks, 2))
+    max_workers = workers or os.cpu_count() or 1
+    if max_workers > 1 and len(head) > 1:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_lookups, initargs=lookups) as pool:
+            pending: Deque[Future] = deque()
+            for chunk in chain(head, chunks):
+                pending.append(pool.submit(_process_chunk, chunk))
+                if len(pending) >= 2 * max_workers:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+    else:
+        _init_lookups(*lookups)
+        for chunk in chain(head, chunks):
+            yield from _process_chunk(chunk)
+
+
+def combine(
+    input_dir: Path, limit: Optional[int] = None, workers: Optional[int] = None
+) -> Iterator[Dict[str, Any]]:
+    """Return a lazy iterator over the combined airports in input_dir.
+
+    Raises FileNotFoundError up front when airports.csv is missing, so callers
+    can fall back to another source before consuming anything. workers is
+    passed to iter_combined; use 1 to build everything in-process.
+    """
+    airports_path = input_dir / "airports.csv"
+    if not airports_path.exists():
+        raise FileNotFoundError(f"Missing airports CSV: {airports_path}")
+    airports = iter_combined(input_dir, workers=workers)
+    return islice(airports, limit) if limit is not None else airports
@@ -8,11 +8,13 @@ from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, Response
 from starlette.exceptions import HTTPException as StarletteHTTPException
+from app.core.cors import SimpleWildcardCORSMiddleware
+from app.core.health import HealthShortCircuitMiddleware
 from app.core.rate_limit import RateLimiterMiddleware
 
 from app.api.system import router as system_router
 from app.api.public import router as public_router
-from app.api.api import router as api_router
+from app.api.api import build_default_payload, router as api_router
 from app.core.config import get_settings
 from app.core.logging import configure_logging
 from app.models.db import populate_db_from_files
@@ -24,6 +26,10 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     # Initialize and populate SQLite database from local data files (idempotent)
     try:
         inserted, total = populate_db_from_files(Path("impoted_data"))
+        # Unfiltered paginated requests reuse this instead of a COUNT(*) per request
+        app.state.airport_total = total
+        # Default /api/airports response, serialized and gzipped once
+        app.state.default_airports = build_default_payload()
         logging.getLogger(__name__).info(
             "SQLite dataset ready: %s inserted, %s total", inserted, total
         )
@@ -36,14 +42,17 @@ def create_app() -> FastAPI:
     settings = get_settings()
     application = FastAPI(title=settings.app_name, lifespan=lifespan, docs_url=None)
 
-    # Configure CORS
-    application.add_middleware(
-        CORSMiddleware,
-        allow_origins=settings.allowed_origins_list,
-        allow_credentials=False,
-        allow_methods=["*"],
-        allow_headers=["*"],
-    )
+    # Configure CORS; a fully open API only needs a constant header
+    if settings.allowed_origins_list == ["*"]:
+        application.add_middleware(SimpleWildcardCORSMiddleware)
+    else:
+        application.add_middleware(
+            CORSMiddleware,
+            allow_origins=settings.allowed_origins_list,
+            allow_credentials=False,
+            allow_methods=["*"],
+            allow_headers=["*"],
+        )
 
     # Static files
     try:
@@ -67,6 +76,9 @@ def create_app() -> FastAPI:
         header_client_ip=settings.rate_limit_client_ip_header or None,
     )
 
+    # Added last so it is the outermost middleware: /health never reaches the router
+    application.add_middleware(HealthShortCircuitMiddleware)
+
     # Routers
     application.include_router(system_router)
     application.include_router(public_router)
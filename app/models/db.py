@@ -1,31 +1,55 @@
-
-import json
+import logging
 import os
 import re
 import sqlite3
+import sys
+import threading
 import unicodedata
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Iterable, List, Optional, Tuple, Dict
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Tuple, Dict, FrozenSet
+
+import orjson
 
-try:
-    # Reuse the data combining logic from the domain module
-    from app.domain.combine_data import combine  # type: ignore
-except Exception:  # pragma: no cover - handled at runtime
-    def combine(*args, **kwargs):  # type: ignore[no-redef]
-        raise RuntimeError("combine_data module is unavailable")
+from app.domain.combine_data import combine
+
+logger = logging.getLogger(__name__)
 
 # -----------------------------
-# Slug helpers (copied to avoid circular imports)
+# Slug helpers
 # -----------------------------
 
+_SLUG_NONALNUM = re.compile(r"[^a-z0-9]+")
+_SLUG_DASHES = re.compile(r"-+")
+
+
+@lru_cache(maxsize=1)
+def _combining_marks_table() -> Dict[int, None]:
+    """str.translate table deleting every combining code point (built on first use)."""
+    return {cp: None for cp in range(sys.maxunicode + 1) if unicodedata.combining(chr(cp))}
+
+
 def slugify(text: Optional[str], fallback: Optional[str] = None) -> str:
+    """Create a URL-friendly slug from a string.
+
+    - Normalize unicode and strip accents (skipped for ASCII input)
+    - Lowercase
+    - Replace non-alphanumeric with hyphens
+    - Collapse multiple hyphens and trim
+    """
     if not text or not isinstance(text, str):
         return (fallback or "").strip().lower()
-    norm = unicodedata.normalize("NFKD", text)
-    norm = "".join(c for c in norm if not unicodedata.combining(c))
-    norm = norm.lower()
-    norm = re.sub(r"[^a-z0-9]+", "-", norm)
-    norm = re.sub(r"-+", "-", norm).strip("-")
+    if text.isascii():
+        # Fast path: nothing to decompose or strip for plain ASCII
+        norm = text.lower()
+    else:
+        # Quick Check first: only decompose when the text isn't already NFKD
+        norm = text
+        if not unicodedata.is_normalized("NFKD", norm):
+            norm = unicodedata.normalize("NFKD", norm)
+        norm = norm.translate(_combining_marks_table()).lower()
+    norm = _SLUG_NONALNUM.sub("-", norm)
+    norm = _SLUG_DASHES.sub("-", norm).strip("-")
     if not norm and fallback:
         return fallback.strip().lower()
     return norm
@@ -50,39 +74,122 @@ def get_db_path() -> Path:
     return Path("data") / "ariconnectapi.db"
 
 
-def get_connection() -> sqlite3.Connection:
-    db_path = get_db_path()
+# Per-thread connection pool: thread -> {db path -> connection}
+_local = threading.local()
+
+_CONNECTION_PRAGMAS = (
+    # Only takes effect on a fresh file (before WAL writes the header); a
+    # no-op for existing databases
+    "page_size=8192",
+    "journal_mode=WAL",
+    "synchronous=NORMAL",
+    "mmap_size=268435456",
+    "cache_size=-131072",
+    "temp_store=MEMORY",
+)
+
+
+def _open_connection(db_path: Path) -> sqlite3.Connection:
     db_path.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(str(db_path))
+    # Larger statement cache: the WHERE/ORDER BY shapes are memoized, so the
+    # same SQL texts repeat and skip re-preparation
+    conn = sqlite3.connect(str(db_path), check_same_thread=False, cached_statements=256)
     conn.row_factory = sqlite3.Row
-    # Enable WAL for better concurrency (best-effort)
-    try:
-        conn.execute("PRAGMA journal_mode=WAL;")
-    except Exception:
-        pass
+    # WAL for concurrent readers, mmap'd reads and a larger page cache (best-effort)
+    for pragma in _CONNECTION_PRAGMAS:
+        try:
+            conn.execute(f"PRAGMA {pragma};")
+        except Exception:
+            pass
     return conn
 
 
+def get_connection() -> sqlite3.Connection:
+    """Return the calling thread's connection to the configured database.
+
+    Connections are opened lazily, once per thread and DB path, and reused by
+    later calls so requests don't pay for connect + PRAGMA setup.
+    """
+    db_path = get_db_path()
+    conns: Optional[Dict[str, sqlite3.Connection]] = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    key = str(db_path)
+    conn = conns.get(key)
+    if conn is None:
+        conn = conns[key] = _open_connection(db_path)
+    return conn
+
+
+def open_connection() -> sqlite3.Connection:
+    """Open a new, unpooled connection to the configured database.
+
+    For work that may hop between threads (e.g. a generator driven from the
+    threadpool); the caller owns the connection and must close it.
+    """
+    return _open_connection(get_db_path())
+
+
+# Bump when the airports schema changes; older DB files are dropped and
+# repopulated from impoted_data/ on the next startup.
+SCHEMA_VERSION = 6
+
+# Whether this SQLite build supports FTS5 (set by create_indexes); without it
+# the 'q' search falls back to LIKE
+_fts5_available = False
+
+
 def init_db(conn: sqlite3.Connection) -> None:
+    create_table_only(conn)
+    create_indexes(conn)
+
+
+def create_table_only(conn: sqlite3.Connection) -> None:
+    """Create the airports table (without indexes), rebuilding it on schema change.
+
+    Filterable text columns are declared COLLATE NOCASE so their indexes are
+    case-insensitive and plain `column = ?` comparisons can use them. The data
+    column holds each airport as compact orjson-encoded bytes.
+    """
+    version = int(conn.execute("PRAGMA user_version;").fetchone()[0])
+    if version != SCHEMA_VERSION:
+        conn.execute("DROP TABLE IF EXISTS airports_fts;")
+        conn.execute("DROP TABLE IF EXISTS airports;")
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION};")
+        _clear_read_caches()
     conn.execute(
         """
         CREATE TABLE IF NOT EXISTS airports (
             slug TEXT PRIMARY KEY,
             id INTEGER,
-            ident TEXT,
-            iata_code TEXT,
-            icao_code TEXT,
-            municipality TEXT,
-            iso_country TEXT,
-            iso_region TEXT,
-            type TEXT,
-            country_name TEXT,
-            region_name TEXT,
-            data TEXT NOT NULL
+            ident TEXT COLLATE NOCASE,
+            name TEXT COLLATE NOCASE,
+            iata_code TEXT COLLATE NOCASE,
+            icao_code TEXT COLLATE NOCASE,
+            municipality TEXT COLLATE NOCASE,
+            iso_country TEXT COLLATE NOCASE,
+            iso_region TEXT COLLATE NOCASE,
+            type TEXT COLLATE NOCASE,
+            country_name TEXT COLLATE NOCASE,
+            region_name TEXT COLLATE NOCASE,
+            sort_key TEXT,
+            data BLOB NOT NULL
         );
         """
     )
+    conn.commit()
+
+
+def create_indexes(conn: sqlite3.Connection) -> None:
+    """Create filter and full-text indexes; idempotent and cheap once they exist.
+
+    populate_db_from_files calls this after the bulk load so index b-trees are
+    built once from sorted data instead of being updated row by row.
+    """
+    global _fts5_available
     # Helpful indexes for filters
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_airports_id ON airports(id);")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_airports_ident ON airports(ident);")
     conn.execute("CREATE INDEX IF NOT EXISTS idx_airports_iata ON airports(iata_code);")
     conn.execute("CREATE INDEX IF NOT EXISTS idx_airports_icao ON airports(icao_code);")
     conn.execute("CREATE INDEX IF NOT EXISTS idx_airports_muni ON airports(municipality);")
@@ -91,32 +198,125 @@ def init_db(conn: sqlite3.Connection) -> None:
     conn.execute("CREATE INDEX IF NOT EXISTS idx_airports_type ON airports(type);")
     conn.execute("CREATE INDEX IF NOT EXISTS idx_airports_country_name ON airports(country_name);")
     conn.execute("CREATE INDEX IF NOT EXISTS idx_airports_region_name ON airports(region_name);")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_airports_sort ON airports(sort_key);")
+    # Full-text index for the unified 'q' search (external content: rows live in airports)
+    try:
+        created = not _table_exists(conn, "airports_fts")
+        conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS airports_fts USING fts5("
+            f"name, {', '.join(_Q_COLUMNS)}, content='airports', content_rowid='rowid');"
+        )
+        if created:
+            _rebuild_fts(conn)
+        _fts5_available = True
+    except sqlite3.OperationalError:
+        _fts5_available = False
     conn.commit()
 
 
+def _table_exists(conn: sqlite3.Connection, name: str) -> bool:
+    cur = conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?;", (name,))
+    return cur.fetchone() is not None
+
+
+def _rebuild_fts(conn: sqlite3.Connection) -> None:
+    # Re-index the full-text table from the content table in one pass
+    if _table_exists(conn, "airports_fts"):
+        conn.execute("INSERT INTO airports_fts(airports_fts) VALUES('rebuild');")
+
+
 def db_has_data(conn: sqlite3.Connection) -> bool:
     cur = conn.execute("SELECT COUNT(1) AS c FROM airports;")
     row = cur.fetchone()
     return bool(row and int(row[0]) > 0)
 
 
+# Listing order: large airports first, then medium, small, everything else
+_TYPE_RANK = {"large_airport": 0, "medium_airport": 1, "small_airport": 2}
+
+
+def _sort_key(a: Dict[str, Any]) -> str:
+    """Precomputed listing order key: type rank digit followed by the lowercased ident.
+
+    The rank is a single digit, so plain string order equals (rank, ident)
+    order and ORDER BY sort_key can walk idx_airports_sort.
+    """
+    rank = _TYPE_RANK.get((a.get("type") or "").lower(), 3)
+    return f"{rank}{(a.get('ident') or '').lower()}"
+
+
+def _is_code_name(ref: Any, code: Any) -> bool:
+    # A plain {"code", "name"} reference that the table's columns can rebuild
+    return (
+        isinstance(ref, dict)
+        and len(ref) == 2
+        and ref.get("code") == code
+        and ref.get("name") is not None
+    )
+
+
+def _pack_airport(a: Dict[str, Any]) -> bytes:
+    """Encode an airport for the data column.
+
+    Nested country/region references are dropped when they are exactly
+    {"code": iso_*, "name": *_name}: both values are already columns, and
+    _unpack_airport rebuilds them on read. This keeps the repeated names out
+    of every blob.
+    """
+    drop_country = _is_code_name(a.get("country"), a.get("iso_country"))
+    drop_region = _is_code_name(a.get("region"), a.get("iso_region"))
+    if not (drop_country or drop_region):
+        return orjson.dumps(a)
+    return orjson.dumps(
+        {
+            k: v
+            for k, v in a.items()
+            if not ((k == "country" and drop_country) or (k == "region" and drop_region))
+        }
+    )
+
+
+# Columns read alongside data so _unpack_airport can rebuild country/region
+_RECORD_COLUMNS: Tuple[str, ...] = ("data", "iso_country", "country_name", "iso_region", "region_name")
+
+
+def _unpack_airport(row: Any) -> Dict[str, Any]:
+    """Decode a _RECORD_COLUMNS row back into the full airport dict."""
+    a = orjson.loads(row[0])
+    if "country" not in a and row[2] is not None:
+        a["country"] = {"code": row[1], "name": row[2]}
+    if "region" not in a and row[4] is not None:
+        a["region"] = {"code": row[3], "name": row[4]}
+    return a
+
+
 def upsert_airports(conn: sqlite3.Connection, airports: Iterable[Dict[str, Any]]) -> int:
+    # Upsert in place: unlike INSERT OR REPLACE, a conflicting slug is updated
+    # rather than deleted and reinserted, so indexes are only touched once
     sql = (
-        "INSERT OR REPLACE INTO airports (slug, id, ident, iata_code, icao_code, municipality, iso_country, iso_region, type, country_name, region_name, data) "
-        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+        "INSERT INTO airports (slug, id, ident, name, iata_code, icao_code, municipality, iso_country, iso_region, type, country_name, region_name, sort_key, data) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT(slug) DO UPDATE SET id=excluded.id, ident=excluded.ident, name=excluded.name, "
+        "iata_code=excluded.iata_code, icao_code=excluded.icao_code, municipality=excluded.municipality, "
+        "iso_country=excluded.iso_country, iso_region=excluded.iso_region, type=excluded.type, "
+        "country_name=excluded.country_name, region_name=excluded.region_name, sort_key=excluded.sort_key, data=excluded.data"
     )
     count = 0
-    with conn:
+
+    def rows() -> Iterator[Tuple[Any, ...]]:
+        nonlocal count
         for a in airports:
             # ensure slug present
             if not a.get("slug"):
                 a["slug"] = airport_slug(a)
             country = a.get("country") or {}
             region = a.get("region") or {}
-            params = (
+            count += 1
+            yield (
                 a.get("slug"),
                 a.get("id"),
                 a.get("ident"),
+                a.get("name"),
                 a.get("iata_code"),
                 a.get("icao_code"),
                 a.get("municipality"),
@@ -125,37 +325,224 @@ def upsert_airports(conn: sqlite3.Connection, airports: Iterable[Dict[str, Any]]
                 a.get("type"),
                 country.get("name"),
                 region.get("name"),
-                json.dumps(a, ensure_ascii=False),
+                _sort_key(a),
+                _pack_airport(a),
             )
-            conn.execute(sql, params)
-            count += 1
+
+    # One prepared statement, one transaction for the whole batch
+    with conn:
+        conn.executemany(sql, rows())
+        if count:
+            _rebuild_fts(conn)
+    if count:
+        _clear_read_caches()
     return count
 
 
 def populate_db_from_files(input_dir: Path) -> Tuple[int, int]:
     """Load data via combine() and populate the SQLite DB if needed.
 
-    Returns a tuple (inserted, total).
+    When input_dir has the OurAirports CSVs, combine() yields airports lazily
+    and they are streamed straight into upsert_airports' executemany, so the
+    dataset is never held in memory. They are built in-process: a web worker
+    shouldn't fork a process pool at startup (the CLI script uses one).
+
+    Without airports.csv, or when combining fails part-way (the insert is one
+    transaction, so nothing is left behind), the precombined
+    airports_combined.json is parsed whole instead.
+
+    Returns a tuple (inserted, total) where total is the number of rows in
+    the airports table.
     """
+    global _ready
     conn = get_connection()
-    init_db(conn)
+    create_table_only(conn)
+    inserted = 0
     if db_has_data(conn):
-        cur = conn.execute("SELECT COUNT(1) FROM airports;")
-        total = int(cur.fetchone()[0])
-        return 0, total
-    # Build dataset
-    try:
-        data = combine(input_dir, limit=None)  # type: ignore[misc]
-    except Exception:
-        # Fallback: load precombined JSON if available
-        combined_path = input_dir / "airports_combined.json"
-        if not combined_path.exists():
-            raise FileNotFoundError(f"Missing combined dataset: {combined_path}")
-        with combined_path.open("r", encoding="utf-8") as f:
-            data = json.load(f)
-    # Ensure slugs present and insert
-    inserted = upsert_airports(conn, data)
-    return inserted, len(data)
+        create_indexes(conn)
+    else:
+        # Build dataset; slugs are filled in on insert and indexes are built
+        # afterwards in one pass
+        from_csv: Optional[int] = None
+        try:
+            from_csv = upsert_airports(conn, combine(input_dir, limit=None, workers=1))
+        except FileNotFoundError:
+            pass
+        except Exception:
+            logger.warning("Combining CSVs in %s failed; using the precombined JSON", input_dir, exc_info=True)
+        if from_csv is not None:
+            inserted = from_csv
+        else:
+            # Fallback: load precombined JSON if available
+            combined_path = input_dir / "airports_combined.json"
+            if not combined_path.exists():
+                raise FileNotFoundError(f"Missing combined dataset: {combined_path}")
+            inserted = upsert_airports(conn, orjson.loads(combined_path.read_bytes()))
+        create_indexes(conn)
+    cur = conn.execute("SELECT COUNT(1) FROM airports;")
+    total = int(cur.fetchone()[0])
+    _ready = True
+    return inserted, total
+
+
+# Set once the schema exists and the dataset is loaded; request paths check
+# this instead of re-running DDL and a COUNT on every call
+_ready = False
+_ready_lock = threading.Lock()
+
+
+def ensure_db_ready(input_dir: Path = Path("impoted_data")) -> None:
+    """Bootstrap the DB once per process if the app lifespan didn't.
+
+    Population failures are not cached, so a later call retries; the empty
+    schema is still created so queries return no rows instead of erroring.
+    """
+    if _ready:
+        return
+    with _ready_lock:
+        if _ready:
+            return
+        try:
+            populate_db_from_files(input_dir)
+        except Exception:
+            # If population fails, proceed; API will 503/500 appropriately later
+            init_db(get_connection())
+
+
+@lru_cache(maxsize=256)
+def count_matching(conn: sqlite3.Connection, where: str, params: Tuple[Any, ...]) -> int:
+    """COUNT airports matching a WHERE clause, memoized per (conn, clause, params).
+
+    Connections are per DB file, so totals from different databases never
+    mix. Every write path (upsert_airports, a schema rebuild) clears this
+    cache.
+    """
+    cur = conn.execute(f"SELECT COUNT(1) FROM airports {where};", params)
+    return int(cur.fetchone()[0])
+
+
+# Exact-match filters: (query_airports argument, column), in emission order,
+# most selective first so rows are rejected as early as possible
+_EQ_FILTERS: Tuple[Tuple[str, str], ...] = (
+    ("iata", "iata_code"),
+    ("icao", "icao_code"),
+    ("municipality", "municipality"),
+    ("iso_region", "iso_region"),
+    ("region_name", "region_name"),
+    ("iso_country", "iso_country"),
+    ("country_name", "country_name"),
+    ("airport_type", "type"),
+)
+# Columns searched by the unified 'q' filter (LIKE fallback); airports_fts
+# indexes the same columns plus name
+_Q_COLUMNS: Tuple[str, ...] = (
+    "ident",
+    "iata_code",
+    "icao_code",
+    "municipality",
+    "iso_country",
+    "country_name",
+    "region_name",
+)
+
+
+def _fts_match_query(q: str) -> str:
+    """Turn free text into an FTS5 query: every token quoted and prefix-matched."""
+    tokens = [t.replace('"', "") for t in q.split()]
+    return " ".join(f'"{t}"*' for t in tokens if t)
+
+
+# NOCASE only folds ASCII letters, so the bounds must be folded the same way
+_ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+
+def _prefix_range(prefix: str) -> Tuple[str, str]:
+    """Return (low, high) bounds so that `col >= low AND col < high` (under
+    COLLATE NOCASE) matches exactly the column values starting with prefix,
+    the range form SQLite itself uses for index-assisted LIKE 'abc%'."""
+    low = prefix.translate(_ASCII_LOWER)
+    successor = min(ord(low[-1]) + 1, sys.maxunicode)
+    if successor == ord("A"):
+        # NOCASE sorts A-Z as a-z; the next folded value after '@' is '['
+        successor = ord("[")
+    return low, low[:-1] + chr(successor)
+
+
+@lru_cache(maxsize=None)
+def _compile_where(active: FrozenSet[str]) -> str:
+    """Build the WHERE clause for a set of active filters.
+
+    The filter space is small and fixed, so each shape is assembled once and
+    the identical SQL text keeps hitting SQLite's per-connection statement cache.
+    Placeholders are emitted in the same order query_airports binds params.
+
+    Conditions are ANDed cheapest first: indexed equalities, the id seek, and
+    only then the text search, so SQLite short-circuits before any LIKE or
+    range block is evaluated on rows the cheap filters already excluded.
+    """
+    conditions = [f"{column} = ?" for name, column in _EQ_FILTERS if name in active]
+    if "type_other" in active:
+        conditions.append("type NOT IN ('large_airport','medium_airport','small_airport')")
+    if "after_id" in active:
+        conditions.append("id > ?")
+    if "q_fts" in active:
+        conditions.append("rowid IN (SELECT rowid FROM airports_fts WHERE airports_fts MATCH ?)")
+    if "q" in active:
+        conditions.append("(" + " OR ".join(f"LOWER({c}) LIKE ?" for c in _Q_COLUMNS) + ")")
+    if "q_prefix" in active:
+        # NOCASE columns: each range is a seek on that column's index
+        conditions.append("(" + " OR ".join(f"({c} >= ? AND {c} < ?)" for c in _Q_COLUMNS) + ")")
+    return ("WHERE " + " AND ".join(conditions)) if conditions else ""
+
+
+# Fields query_airports can return straight from their denormalized columns
+# (the field name is the column name), skipping the data blob entirely
+AIRPORT_FIELDS: FrozenSet[str] = frozenset(
+    {
+        "slug",
+        "id",
+        "ident",
+        "name",
+        "iata_code",
+        "icao_code",
+        "municipality",
+        "iso_country",
+        "iso_region",
+        "type",
+        "country_name",
+        "region_name",
+    }
+)
+
+
+@lru_cache(maxsize=256)
+def _build_select(
+    active: FrozenSet[str], *, keyset: bool, paging: str, columns: Tuple[str, ...] = _RECORD_COLUMNS
+) -> str:
+    """Assemble the full SELECT for a query shape (filters, ordering, paging).
+
+    paging is "page" (LIMIT ? OFFSET ?), "limit" (LIMIT ?) or "" (no limit);
+    columns are the selected columns (the full record by default).
+    Keyed on shape only, so each combination is built once and always yields
+    the same SQL text for the connection's statement cache.
+    """
+    where = _compile_where(active)
+    if keyset:
+        # Keyset pages walk the id index in order
+        order_clause = " ORDER BY id"
+    else:
+        # Order: prioritize large airports first, then medium, small, others; tie-breaker by ident
+        order_clause = " ORDER BY sort_key"
+        if "q_prefix" in active:
+            # Unary + hides idx_airports_sort from the planner: otherwise it
+            # walks the whole sort index instead of the per-column range seeks
+            order_clause = " ORDER BY +sort_key"
+    sql = f"SELECT {', '.join(columns)} FROM airports {where}{order_clause}"
+    if paging == "page":
+        sql += " LIMIT ? OFFSET ?"
+    elif paging == "limit":
+        sql += " LIMIT ?"
+    return sql
 
 
 def query_airports(
@@ -170,99 +557,168 @@ def query_airports(
     iso_region: Optional[str] = None,
     airport_type: Optional[str] = None,
     q: Optional[str] = None,
+    q_prefix: bool = False,
     limit: Optional[int] = None,
     page: Optional[int] = None,
     page_size: Optional[int] = None,
+    after_id: Optional[int] = None,
+    keyset: bool = False,
+    count_total: bool = True,
+    fields: Optional[Sequence[str]] = None,
 ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
     """Query airports as list of dicts. Returns (items, total_count_for_pagination).
 
     When page_size is provided, total_count is returned; otherwise it's None.
-    """
-    # Ensure DB schema and data are present even if lifespan didn't run
-    init_db(conn)
-    try:
-        if not db_has_data(conn):
-            populate_db_from_files(Path("impoted_data"))
-    except Exception:
-        # If population fails, proceed; API will 503/500 appropriately later
-        pass
+    Pass count_total=False when the caller already knows the total.
 
-    conditions = []
-    params: List[Any] = []
+    q is a full-text search: each whitespace-separated token must start a
+    word in the name, codes, municipality or country/region (so "ken" finds
+    "Kennedy" but "fk" doesn't find "KJFK"). Builds without FTS5 fall back to
+    a substring LIKE.
 
-    def add_eq(field: str, value: Optional[str]) -> None:
-        if value is not None:
-            conditions.append(f"LOWER({field}) = LOWER(?)")
-            params.append(value)
+    With q_prefix=True, q matches codes, municipality and country/region
+    values that start with it (as whole column values, not the airport name) instead of the full-text token search.
+
+    When keyset is True, rows are ordered by id and only those with id greater
+    than after_id are returned (up to limit). No COUNT is issued in that mode.
+
+    When fields is given (names from AIRPORT_FIELDS), only those columns are
+    selected and each item is a flat dict of them; the stored JSON is neither
+    read nor parsed. Unknown field names raise ValueError.
+    """
+    columns: Tuple[str, ...] = _RECORD_COLUMNS
+    if fields:
+        unknown = [f for f in fields if f not in AIRPORT_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        columns = tuple(dict.fromkeys(fields))
 
-    # Exact-match filters
-    add_eq("iata_code", iata)
-    add_eq("icao_code", icao)
-    add_eq("municipality", municipality)
-    add_eq("iso_country", iso_country)
-    add_eq("iso_region", iso_region)
-    add_eq("country_name", country_name)
-    add_eq("region_name", region_name)
+    # Ensure DB schema and data are present even if lifespan didn't run
+    ensure_db_ready()
 
+    # Collect which filters are active (the SQL shape) and their bound values
+    active: List[str] = []
+    params: List[Any] = []
+    values = {
+        "iata": iata,
+        "icao": icao,
+        "municipality": municipality,
+        "iso_country": iso_country,
+        "iso_region": iso_region,
+        "country_name": country_name,
+        "region_name": region_name,
+    }
     # Type filter; if unified 'other' is requested, map it to NOT IN common types
     if airport_type is not None and isinstance(airport_type, str) and airport_type.strip().lower() == "other":
-        conditions.append("LOWER(type) NOT IN ('large_airport','medium_airport','small_airport')")
+        active_type = "type_other"
     else:
-        add_eq("type", airport_type)
+        values["airport_type"] = airport_type
+        active_type = ""
+    for name, _column in _EQ_FILTERS:
+        value = values.get(name)
+        if value is not None:
+            active.append(name)
+            params.append(value)
+    if active_type:
+        active.append(active_type)
 
-    # Unified q search across several columns (case-insensitive LIKE)
+    # Cursor (keyset) pagination: seek past the last seen id via the index
+    if keyset and after_id is not None:
+        active.append("after_id")
+        params.append(after_id)
+
+    # Unified q search: full-text prefix match, or case-insensitive LIKE without FTS5
     if q is not None and isinstance(q, str) and q.strip() != "":
-        like = f"%{q.strip().lower()}%"
-        or_parts = [
-            "LOWER(ident) LIKE ?",
-            "LOWER(iata_code) LIKE ?",
-            "LOWER(icao_code) LIKE ?",
-            "LOWER(municipality) LIKE ?",
-            "LOWER(iso_country) LIKE ?",
-            "LOWER(country_name) LIKE ?",
-            "LOWER(region_name) LIKE ?",
-        ]
-        conditions.append("(" + " OR ".join(or_parts) + ")")
-        params.extend([like] * len(or_parts))
-
-    where = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+        match = _fts_match_query(q) if _fts5_available and not q_prefix else None
+        if q_prefix:
+            active.append("q_prefix")
+            for _column in _Q_COLUMNS:
+                params.extend(_prefix_range(q.strip()))
+        elif match:
+            active.append("q_fts")
+            params.append(match)
+        elif not _fts5_available:
+            active.append("q")
+            params.extend([f"%{q.strip().lower()}%"] * len(_Q_COLUMNS))
+        else:
+            # Only quote characters: nothing to match
+            return [], (0 if page_size is not None else None)
+
+    if keyset:
+        sql = _build_select(
+            frozenset(active), keyset=True, paging="limit" if limit is not None else "", columns=columns
+        )
+        if limit is not None:
+            params.append(limit)
+        cur = conn.execute(sql, params)
+        return _rows_to_items(cur.fetchall(), columns), None
 
     total: Optional[int] = None
-    if page_size is not None:
-        cur = conn.execute(f"SELECT COUNT(1) FROM airports {where};", params)
-        total = int(cur.fetchone()[0])
-
-    # Order: prioritize large airports first, then medium, small, others; tie-breaker by ident
-    order_clause = (
-        " ORDER BY CASE LOWER(type) WHEN 'large_airport' THEN 0 "
-        "WHEN 'medium_airport' THEN 1 WHEN 'small_airport' THEN 2 ELSE 3 END, "
-        "LOWER(COALESCE(ident, ''))"
-    )
+    if page_size is not None and count_total:
+        total = count_matching(conn, _compile_where(frozenset(active)), tuple(params))
 
-    sql = f"SELECT data FROM airports {where}{order_clause}"
     if page_size is not None and page is not None:
         off = max(0, (page - 1) * page_size)
-        sql += " LIMIT ? OFFSET ?"
+        paging = "page"
         qparams = params + [page_size, off]
     elif limit is not None:
-        sql += " LIMIT ?"
+        paging = "limit"
         qparams = params + [limit]
     else:
+        paging = ""
         qparams = params
+    sql = _build_select(frozenset(active), keyset=False, paging=paging, columns=columns)
 
     cur = conn.execute(sql, qparams)
-    items = [json.loads(r[0]) for r in cur.fetchall()]
+    items = _rows_to_items(cur.fetchall(), columns)
     return items, total
 
 
-def get_airport_by_slug(conn: sqlite3.Connection, slug: str) -> Optional[Dict[str, Any]]:
+def _rows_to_items(rows: List[sqlite3.Row], columns: Tuple[str, ...]) -> List[Dict[str, Any]]:
+    if columns == _RECORD_COLUMNS:
+        return [_unpack_airport(r) for r in rows]
+    return [dict(zip(columns, r)) for r in rows]
+
+
+# Airports found by slug: slug -> record. Misses are never stored, so
+# arbitrary unknown slugs can't fill the memo
+_SLUG_CACHE: Dict[str, Dict[str, Any]] = {}
+_SLUG_CACHE_SIZE = 4096
+_slug_cache_lock = threading.Lock()
+
+
+def clear_slug_cache() -> None:
+    with _slug_cache_lock:
+        _SLUG_CACHE.clear()
+
+
+def _clear_read_caches() -> None:
+    # Called whenever airports rows change
+    count_matching.cache_clear()
+    clear_slug_cache()
+
+
+def get_airport_by_slug(slug: str) -> Optional[Dict[str, Any]]:
+    """Return the airport stored under slug, or None.
+
+    Hits are memoized (and cleared when populate_db_from_files inserts
+    rows), so callers must treat the returned dict as read-only.
+    """
+    airport = _SLUG_CACHE.get(slug)
+    if airport is not None:
+        return airport
     # Ensure DB exists and is populated for direct detail access
-    init_db(conn)
-    try:
-        if not db_has_data(conn):
-            populate_db_from_files(Path("impoted_data"))
-    except Exception:
-        pass
-    cur = conn.execute("SELECT data FROM airports WHERE slug = ?", (slug,))
+    ensure_db_ready()
+    cur = get_connection().execute(
+        f"SELECT {', '.join(_RECORD_COLUMNS)} FROM airports WHERE slug = ?", (slug,)
+    )
     row = cur.fetchone()
-    return json.loads(row[0]) if row else None
+    if not row:
+        return None
+    airport = _unpack_airport(row)
+    with _slug_cache_lock:
+        if len(_SLUG_CACHE) >= _SLUG_CACHE_SIZE:
+            # Evict the oldest entry (dicts keep insertion order)
+            del _SLUG_CACHE[next(iter(_SLUG_CACHE))]
+        _SLUG_CACHE[slug] = airport
+    return airport
@@ -7,21 +7,26 @@ All-in-one helper to obtain flight-related data for this project:
 
 Notes:
 - The scraping step writes airline_routes.json into the chosen output directory.
-- The combining step is implemented inline in this script and writes
-  airports_combined.json next to the downloaded CSV files.
+- The combining step uses app.domain.combine_data (shared with the app's
+  DB populate) and writes airports_combined.json next to the downloaded CSV files.
 """
 import argparse
-import csv
-import json
+import asyncio
 import logging
 import subprocess
 import sys
 from pathlib import Path
 
-from typing import Iterable, List, Optional, Dict, Any
+from typing import Iterable, List, Optional
 from urllib.parse import urlparse
 
 import httpx
+import orjson
+
+# Allow running as `python scripts/get_all_flight_info.py` from anywhere
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.domain.combine_data import iter_combined  # noqa: E402
 
 # Embedded downloader logic (moved from scripts/download_data.py)
 # List of URLs to download
@@ -44,8 +49,8 @@ def filename_from_url(url: str) -> str:
     return name or "downloaded_file"
 
 
-def download_file(
-    client: httpx.Client,
+async def download_file_async(
+    client: httpx.AsyncClient,
     url: str,
     dest: Path,
     force: bool = False,
@@ -61,10 +66,10 @@ def download_file(
     last_error: Optional[Exception] = None
     for attempt in range(1, retries + 1):
         try:
-            with client.stream("GET", url, follow_redirects=True) as response:
+            async with client.stream("GET", url, follow_redirects=True) as response:
                 response.raise_for_status()
                 with open(temp_dest, "wb") as f:
-                    for chunk in response.iter_bytes():
+                    async for chunk in response.aiter_bytes():
                         if chunk:
                             f.write(chunk)
             temp_dest.replace(dest)
@@ -86,16 +91,23 @@ def download_file(
     raise RuntimeError(f"Failed to download {url} after {retries} attempts")
 
 
-def download_all(urls: Iterable[str], output_dir: Path, force: bool = False) -> None:
+async def _download_all_async(urls: Iterable[str], output_dir: Path, force: bool = False) -> None:
     timeout = httpx.Timeout(connect=10.0, read=60.0, write=30.0, pool=10.0)
     limits = httpx.Limits(max_keepalive_connections=5, max_connections=10)
     headers = {"User-Agent": "airconnectapi-downloader/1.0"}
 
-    with httpx.Client(timeout=timeout, limits=limits, headers=headers) as client:
-        for url in urls:
-            filename = filename_from_url(url)
-            dest = output_dir / filename
-            download_file(client, url, dest, force=force)
+    async with httpx.AsyncClient(timeout=timeout, limits=limits, headers=headers) as client:
+        await asyncio.gather(
+            *(
+                download_file_async(client, url, output_dir / filename_from_url(url), force=force)
+                for url in urls
+            )
+        )
+
+
+def download_all(urls: Iterable[str], output_dir: Path, force: bool = False) -> None:
+    """Download all URLs concurrently (bounded by the client's connection limits)."""
+    asyncio.run(_download_all_async(urls, output_dir, force=force))
 
 
 def configure_logging() -> None:
@@ -135,161 +147,40 @@ def run_scraper(output_dir: Path) -> None:
         logging.warning("Python executable or script not found: %s", exc)
 
 
-def run_combine(input_dir: Path, output_file: Path | None = None, indent: int | None = 2) -> None:
-    """Combine OurAirports CSVs into a single JSON file (inline implementation).
+def run_combine(
+    input_dir: Path,
+    output_file: Path | None = None,
+    indent: int | None = 2,
+    workers: int | None = None,
+) -> None:
+    """Combine OurAirports CSVs into a single JSON file (see app.domain.combine_data).
 
-    Input directory is expected to contain at least airports.csv. If countries.csv,
-    regions.csv, and airport-comments.csv are present, they are used to enrich
-    each airport with nested country/region objects and a comments list.
+    The JSON array is written incrementally, one airport at a time.
     """
-
-    def _safe_int(v: Any) -> Optional[int]:
-        try:
-            if v is None:
-                return None
-            s = str(v).strip()
-            if s == "":
-                return None
-            return int(float(s))  # handle values like '123.0'
-        except Exception:
-            return None
-
-    def _safe_float(v: Any) -> Optional[float]:
-        try:
-            if v is None:
-                return None
-            s = str(v).strip()
-            if s == "":
-                return None
-            return float(s)
-        except Exception:
-            return None
-
-    def _read_csv(path: Path) -> Iterable[Dict[str, Any]]:
-        with open(path, "r", encoding="utf-8", newline="") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                # Normalize whitespace
-                yield {k: (v.strip() if isinstance(v, str) else v) for k, v in row.items()}
-
     if output_file is None:
         output_file = input_dir / "airports_combined.json"
 
-    airports_path = input_dir / "airports.csv"
-    countries_path = input_dir / "countries.csv"
-    regions_path = input_dir / "regions.csv"
-    comments_path = input_dir / "airport-comments.csv"
-
-    if not airports_path.exists():
+    if not (input_dir / "airports.csv").exists():
         logging.warning("airports.csv not found in %s; skipping combine.", input_dir)
         return
 
-    # Load reference data (optional)
-    countries_by_code: Dict[str, Dict[str, Any]] = {}
-    if countries_path.exists():
-        try:
-            for c in _read_csv(countries_path):
-                code = (c.get("code") or "").strip()
-                if code:
-                    countries_by_code[code] = {"code": code, "name": c.get("name")}
-        except Exception as exc:
-            logging.warning("Failed to read countries.csv: %s", exc)
-
-    regions_by_code: Dict[str, Dict[str, Any]] = {}
-    if regions_path.exists():
-        try:
-            for r in _read_csv(regions_path):
-                code = (r.get("code") or "").strip()
-                if code:
-                    regions_by_code[code] = {"code": code, "name": r.get("name")}
-        except Exception as exc:
-            logging.warning("Failed to read regions.csv: %s", exc)
-
-    comments_by_ident: Dict[str, List[Dict[str, Any]]] = {}
-    comments_by_ref: Dict[str, List[Dict[str, Any]]] = {}
-    if comments_path.exists():
-        try:
-            for cm in _read_csv(comments_path):
-                ident = (cm.get("airport_ident") or "").strip()
-                ref = (cm.get("airport_ref") or "").strip()
-                if ident:
-                    comments_by_ident.setdefault(ident, []).append(cm)
-                if ref:
-                    comments_by_ref.setdefault(ref, []).append(cm)
-        except Exception as exc:
-            logging.warning("Failed to read airport-comments.csv: %s", exc)
-
-    # Build combined list
-    combined: List[Dict[str, Any]] = []
-    total = 0
-    with open(airports_path, "r", encoding="utf-8", newline="") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            total += 1
-            try:
-                aid = _safe_int(row.get("id"))
-                ident = (row.get("ident") or "").strip()
-                iso_country = (row.get("iso_country") or "").strip()
-                iso_region = (row.get("iso_region") or "").strip()
-
-                a: Dict[str, Any] = {
-                    "id": aid,
-                    "ident": ident or None,
-                    "type": (row.get("type") or "").strip() or None,
-                    "name": (row.get("name") or "").strip() or None,
-                    "latitude_deg": _safe_float(row.get("latitude_deg")),
-                    "longitude_deg": _safe_float(row.get("longitude_deg")),
-                    "elevation_ft": _safe_int(row.get("elevation_ft")),
-                    "continent": (row.get("continent") or "").strip() or None,
-                    "iso_country": iso_country or None,
-                    "iso_region": iso_region or None,
-                    "municipality": (row.get("municipality") or "").strip() or None,
-                    "gps_code": (row.get("gps_code") or "").strip() or None,
-                    "iata_code": (row.get("iata_code") or "").strip() or None,
-                    "icao_code": (row.get("icao_code") or "").strip() or None,
-                    "local_code": (row.get("local_code") or "").strip() or None,
-                    "home_link": (row.get("home_link") or "").strip() or None,
-                    "wikipedia_link": (row.get("wikipedia_link") or "").strip() or None,
-                    "keywords": (row.get("keywords") or "").strip() or None,
-                }
-
-                # Attach country/region metadata if available
-                if iso_country and iso_country in countries_by_code:
-                    a["country"] = countries_by_code[iso_country]
-                if iso_region and iso_region in regions_by_code:
-                    a["region"] = regions_by_code[iso_region]
-
-                # Attach comments (by ident and by ref)
-                comments: List[Dict[str, Any]] = []
-                if ident:
-                    comments.extend(comments_by_ident.get(ident, []))
-                if aid is not None:
-                    comments.extend(comments_by_ref.get(str(aid), []))
-                if comments:
-                    a["comments"] = comments
-                else:
-                    a["comments"] = []
-
-                combined.append(a)
-            except Exception as exc:  # best-effort; skip bad rows
-                logging.warning("Skipping airport row due to error: %s", exc)
-                continue
-
     # Write output
     try:
-        indent_val = None if indent in (None, 0) else indent
+        # orjson only pretty-prints with 2 spaces; any indent selects that
+        option = orjson.OPT_INDENT_2 if indent else 0
+        sep = b"\n" if indent else b""
+        count = 0
         output_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(combined, f, ensure_ascii=False, indent=indent_val)
-        logging.info(
-            "Combined %d airports into %s (countries=%d, regions=%d, comments_by_ident=%d, comments_by_ref=%d)",
-            len(combined),
-            output_file,
-            len(countries_by_code),
-            len(regions_by_code),
-            len(comments_by_ident),
-            len(comments_by_ref),
-        )
+        with open(output_file, "wb") as f:
+            f.write(b"[")
+            for a in iter_combined(input_dir, workers=workers):
+                if count:
+                    f.write(b",")
+                f.write(sep)
+                f.write(orjson.dumps(a, option=option))
+                count += 1
+            f.write(sep + b"]")
+        logging.info("Combined %d airports into %s", count, output_file)
     except Exception as exc:
         logging.warning("Failed to write combined JSON: %s", exc)
 
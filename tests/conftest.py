@@ -0,0 +1,62 @@
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import httpx
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+
+
+def pytest_configure(config):
+    # Under pytest-xdist each worker is its own process with its own session
+    # fixtures; give each one a private SQLite file (in a temp dir, removed at
+    # exit) so their populates don't race
+    worker = os.environ.get("PYTEST_XDIST_WORKER")
+    if worker and "DB_PATH" not in os.environ:
+        tmp_dir = tempfile.mkdtemp(prefix=f"ariconnectapi-{worker}-")
+        config._worker_db_dir = tmp_dir
+        os.environ["DB_PATH"] = str(Path(tmp_dir) / "ariconnectapi.db")
+
+
+def pytest_unconfigure(config):
+    tmp_dir = getattr(config, "_worker_db_dir", None)
+    if tmp_dir:
+        os.environ.pop("DB_PATH", None)
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def client():
+    # Enter the client once so the app lifespan (DB populate) runs a single time
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture(scope="session")
+def asgi_transport():
+    return httpx.ASGITransport(app=app)
+
+
+@pytest.fixture(scope="session")
+def get_airports(client):
+    """GET /api/airports memoized per query params for the session.
+
+    Returns (status_code, parsed JSON, headers); tests must not mutate them.
+    headers is a plain dict built once from the raw header list, keyed by
+    lowercased name.
+    """
+    cache = {}
+
+    def _get(**params):
+        key = tuple(sorted(params.items()))
+        if key not in cache:
+            resp = client.get("/api/airports", params=params)
+            headers = {k.decode().lower(): v.decode() for k, v in resp.headers.raw}
+            cache[key] = (resp.status_code, orjson.loads(resp.content), headers)
+        return cache[key]
+
+    return _get
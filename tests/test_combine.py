@@ -0,0 +1,72 @@
+import orjson
+import pytest
+
+from app.domain import combine_data
+from app.domain.combine_data import combine
+from app.models import db
+from app.models.db import get_connection, populate_db_from_files
+
+AIRPORTS_CSV = (
+    '"id","ident","type","name","latitude_deg","longitude_deg","iso_country","iso_region","municipality","iata_code"\n'
+    '3622,"KJFK","large_airport","John F Kennedy International Airport","40.63","-73.77","US","US-NY","New York","JFK"\n'
+    '5,"X01","heliport","Test Heliport","","","BR","BR-SP","Sao Paulo",""\n'
+)
+
+
+@pytest.fixture
+def csv_dir(tmp_path):
+    (tmp_path / "airports.csv").write_text(AIRPORTS_CSV, encoding="utf-8")
+    (tmp_path / "countries.csv").write_text('"code","name"\n"US","United States"\n', encoding="utf-8")
+    (tmp_path / "regions.csv").write_text('"code","name"\n"US-NY","New York"\n', encoding="utf-8")
+    return tmp_path
+
+
+@pytest.fixture
+def tmp_db(tmp_path, monkeypatch):
+    # populate_db_from_files marks the process ready; restore that flag too so
+    # later tests still bootstrap the real database
+    monkeypatch.setattr(db, "_ready", db._ready)
+    monkeypatch.setenv("DB_PATH", str(tmp_path / "db" / "airports.db"))
+
+
+def test_combine_nests_country_and_region(csv_dir):
+    airports = list(combine(csv_dir))
+    assert [a["ident"] for a in airports] == ["KJFK", "X01"]
+    jfk = airports[0]
+    assert jfk["id"] == 3622
+    assert jfk["latitude_deg"] == 40.63
+    assert jfk["country"] == {"code": "US", "name": "United States"}
+    assert jfk["region"] == {"code": "US-NY", "name": "New York"}
+    assert jfk["comments"] == []
+    # Unknown lookups and empty values are left out / None
+    assert "country" not in airports[1]
+    assert airports[1]["iata_code"] is None
+
+
+def test_combine_is_lazy_and_honours_limit(csv_dir):
+    airports = combine(csv_dir, limit=1)
+    assert not isinstance(airports, list)
+    assert len(list(airports)) == 1
+
+
+def test_combine_without_airports_csv_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        combine(tmp_path)
+
+
+def test_populate_builds_csvs_in_process(csv_dir, tmp_db, monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise AssertionError("populate must not start a process pool")
+
+    monkeypatch.setattr(combine_data, "ProcessPoolExecutor", no_pool)
+    monkeypatch.setattr(combine_data, "COMBINE_CHUNK_SIZE", 1)
+    assert populate_db_from_files(csv_dir) == (2, 2)
+
+
+def test_populate_falls_back_to_json_on_malformed_csv(csv_dir, tmp_db):
+    # Not valid UTF-8: combining fails part-way through the stream
+    (csv_dir / "airports.csv").write_bytes(AIRPORTS_CSV.encode("utf-8") + b'7,"\xff\xfe"\n')
+    fallback = [{"id": 1, "ident": "ZZZZ", "name": "Fallback Field"}]
+    (csv_dir / "airports_combined.json").write_bytes(orjson.dumps(fallback))
+    assert populate_db_from_files(csv_dir) == (1, 1)
+    assert [r[0] for r in get_connection().execute("SELECT ident FROM airports")] == ["ZZZZ"]
@@ -0,0 +1,32 @@
+"""Tests for helpers in app.models.db."""
+
+from app.models import db
+
+
+def test_slug_lookup_memoizes_hits_only(client):
+    db.clear_slug_cache()
+    assert db.get_airport_by_slug("no-such-airport-slug") is None
+    assert "no-such-airport-slug" not in db._SLUG_CACHE
+
+    slug = db.get_connection().execute("SELECT slug FROM airports LIMIT 1").fetchone()[0]
+    airport = db.get_airport_by_slug(slug)
+    assert airport is not None
+    assert db._SLUG_CACHE[slug] is airport
+    assert db.get_airport_by_slug(slug) is airport
+
+
+def test_count_matching_uses_conn_and_is_cleared_on_write(tmp_path, monkeypatch):
+    conns = []
+    for name in ("a.db", "b.db"):
+        monkeypatch.setenv("DB_PATH", str(tmp_path / name))
+        conn = db.open_connection()
+        db.create_table_only(conn)
+        conns.append(conn)
+    a, b = conns
+    db.upsert_airports(a, [{"id": 1, "ident": "AAAA", "name": "First"}])
+    assert db.count_matching(a, "", ()) == 1
+    assert db.count_matching(b, "", ()) == 0
+    db.upsert_airports(a, [{"id": 2, "ident": "BBBB", "name": "Second"}])
+    assert db.count_matching(a, "", ()) == 2
+    for conn in conns:
+        conn.close()
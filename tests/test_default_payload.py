@@ -0,0 +1,82 @@
+"""The unfiltered /api/airports request is served from a payload prebuilt at startup."""
+
+import gzip
+
+import orjson
+import pytest
+
+from app.api.api import _accepts_gzip, _etag_matches
+
+
+def test_default_response_has_etag(client):
+    resp = client.get("/api/airports", headers={"Accept-Encoding": "identity"})
+    assert resp.status_code == 200
+    # Weak, since the gzip and identity bodies share it
+    assert resp.headers["etag"].startswith('W/"')
+    assert resp.headers["vary"] == "Accept-Encoding"
+    assert len(resp.json()) == 50
+
+
+def test_if_none_match_returns_304(client):
+    etag = client.get("/api/airports").headers["etag"]
+    resp = client.get("/api/airports", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.headers["etag"] == etag
+    assert resp.content == b""
+
+
+def test_gzip_and_identity_bodies_match(client):
+    identity = client.get("/api/airports", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+    # Read the raw stream so httpx doesn't transparently decompress it
+    with client.stream("GET", "/api/airports", headers={"Accept-Encoding": "gzip"}) as resp:
+        assert resp.headers["content-encoding"] == "gzip"
+        raw = b"".join(resp.iter_raw())
+    assert orjson.loads(gzip.decompress(raw)) == identity.json()
+
+
+def test_gzip_refused_with_q0(client):
+    resp = client.get("/api/airports", headers={"Accept-Encoding": "gzip;q=0, identity"})
+    assert resp.status_code == 200
+    assert "content-encoding" not in resp.headers
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("gzip", True),
+        ("GZIP", True),
+        ("deflate, gzip;q=0.5", True),
+        ("gzip; q=0", False),
+        ("gzip;q=0.0", False),
+        ("x-gzip", False),
+        ("*", True),
+        ("*, gzip;q=0", False),
+        ("identity", False),
+        ("", False),
+    ],
+)
+def test_accepts_gzip(header, expected):
+    assert _accepts_gzip(header) is expected
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ('W/"abc"', True),
+        ('"abc"', True),
+        ('"x", W/"abc"', True),
+        ("*", True),
+        ('"abcd"', False),
+        ('W/"x"', False),
+        ("", False),
+    ],
+)
+def test_etag_matches(header, expected):
+    assert _etag_matches(header, 'W/"abc"') is expected
+
+
+def test_if_none_match_list_returns_304(client):
+    etag = client.get("/api/airports").headers["etag"]
+    resp = client.get("/api/airports", headers={"If-None-Match": f'"other", {etag[2:]}'})
+    assert resp.status_code == 304
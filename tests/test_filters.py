@@ -1,6 +1,9 @@
+import sqlite3
+
 import pytest
 from fastapi.testclient import TestClient
 
+from app.models.db import _Q_COLUMNS, _build_select, _prefix_range, get_connection
 from main import app
 
 client = TestClient(app)
@@ -63,6 +66,27 @@ class TestAirportsFilters:
         assert 1 <= len(data) <= 3
         assert_all(data, lambda a: (a.get("type") or "").lower() == "large_airport")
 
+    def test_q_prefix_search(self):
+        resp = client.get("/api/airports", params={"q": "kj", "q_prefix": "true", "limit": 5})
+        assert resp.status_code == 200
+        data = resp.json()
+        assert 1 <= len(data) <= 5
+        assert_all(
+            data,
+            lambda a: any(
+                (v or "").lower().startswith("kj")
+                for v in (
+                    a.get("ident"),
+                    a.get("iata_code"),
+                    a.get("icao_code"),
+                    a.get("municipality"),
+                    a.get("iso_country"),
+                    (a.get("country") or {}).get("name"),
+                    (a.get("region") or {}).get("name"),
+                )
+            ),
+        )
+
     def test_limit_without_filters(self):
         resp = client.get("/api/airports", params={"limit": 4})
         assert resp.status_code == 200
@@ -78,3 +102,56 @@ def test_filter_by_iso_region_choice_with_limit():
     data = resp.json()
     assert 1 <= len(data) <= 3
     assert_all(data, lambda a: (a.get("iso_region") or "").lower() == "us-ny")
+
+
+def test_fields_returns_flat_columns():
+    resp = client.get("/api/airports", params={"iata": "JFK", "fields": "iata_code,name,country_name"})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert len(data) >= 1
+    assert all(set(item) == {"iata_code", "name", "country_name"} for item in data)
+    assert_all(data, lambda a: (a.get("iata_code") or "").lower() == "jfk")
+
+
+def test_unknown_field_rejected():
+    resp = client.get("/api/airports", params={"fields": "iata_code,data"})
+    assert resp.status_code == 400
+
+
+def test_q_prefix_plan_uses_column_indexes():
+    # The prefix search must seek each column's index, not walk the sort index
+    client.get("/api/airports", params={"limit": 1})  # make sure the DB is populated
+    sql = _build_select(frozenset({"q_prefix"}), keyset=False, paging="limit")
+    params = list(_prefix_range("zzq")) * len(_Q_COLUMNS) + [50]
+    plan = " ".join(row[3] for row in get_connection().execute("EXPLAIN QUERY PLAN " + sql, params))
+    assert "MULTI-INDEX OR" in plan
+    assert "idx_airports_sort" not in plan
+
+
+def test_q_matches_word_prefixes_not_substrings():
+    # Without q_prefix, q is a token search: each word must start a word
+    resp = client.get("/api/airports", params={"q": "kennedy"})
+    assert resp.status_code == 200
+    assert "KJFK" in {a.get("ident") for a in resp.json()}
+    resp = client.get("/api/airports", params={"q": "kjf"})
+    assert "KJFK" in {a.get("ident") for a in resp.json()}
+    # A mid-word fragment is not a match
+    resp = client.get("/api/airports", params={"q": "fk"})
+    assert resp.status_code == 200
+    assert "KJFK" not in {a.get("ident") for a in resp.json()}
+
+
+@pytest.mark.parametrize("prefix", ["kj", "KJ", "a@", "S\u00e3o", "\u212aJ"])
+def test_prefix_range_matches_nocase_startswith(prefix):
+    # The bounds must select exactly the values that start with prefix once
+    # both are folded the way NOCASE folds (ASCII letters only)
+    values = ["KJFK", "kjx", "KK", "a@b", "a[", "aA", "S\u00e3o Paulo", "S\u00c3O", "\u212aJX", "kjz"]
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE t (v TEXT COLLATE NOCASE)")
+    conn.executemany("INSERT INTO t VALUES (?)", [(v,) for v in values])
+    got = {r[0] for r in conn.execute("SELECT v FROM t WHERE v >= ? AND v < ?", _prefix_range(prefix))}
+
+    def fold(text):
+        return "".join(c.lower() if "A" <= c <= "Z" else c for c in text)
+
+    assert got == {v for v in values if fold(v).startswith(fold(prefix))}
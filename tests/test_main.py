@@ -18,6 +18,38 @@ class TestRootEndpoint:
         assert b"Air connect API" in response.content
 
 
+class TestHealthEndpoint:
+    """Health check should answer without touching the dataset."""
+
+    def test_health_ok(self):
+        response = client.get("/health")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert response.json() == {"status": "ok"}
+
+
+class TestCors:
+    """Default ALLOWED_ORIGINS=* exposes the site and API to any origin."""
+
+    def test_simple_request_allows_any_origin(self):
+        response = client.get("/about", headers={"Origin": "http://example.com"})
+        assert response.headers["access-control-allow-origin"] == "*"
+
+    def test_preflight(self):
+        response = client.options(
+            "/api/airports",
+            headers={
+                "Origin": "http://example.com",
+                "Access-Control-Request-Method": "GET",
+                "Access-Control-Request-Headers": "x-custom",
+            },
+        )
+        assert response.status_code in (200, 204)
+        assert response.headers["access-control-allow-origin"] == "*"
+        assert "GET" in response.headers["access-control-allow-methods"]
+        assert response.headers["access-control-allow-headers"].lower() == "x-custom"
+
+
 class TestHelloEndpoint:
     """Hello endpoint should no longer exist."""
 
@@ -1,69 +1,96 @@
+import asyncio
+
+import httpx
+import orjson
 import pytest
-from fastapi.testclient import TestClient
 
-from main import app
+from app.api.api import encode_cursor
 
-client = TestClient(app)
 
+def _hi(headers, key):
+    """Parse an integer header; int(float()) also accepts values like "12.0"."""
+    return int(float(headers[key]))
 
-def test_pagination_headers_and_count():
-    resp = client.get("/api/airports", params={"size": 5})
-    assert resp.status_code == 200
-    data = resp.json()
-    assert isinstance(data, list)
-    assert len(data) <= 5
 
-    headers = resp.headers
-    # Required pagination headers should be present
-    assert "X-Total-Count" in headers
-    assert "X-Page" in headers
-    assert "X-Page-Size" in headers
-    assert "X-Total-Pages" in headers
+def _assert_page_shape(result, expected_page, expected_size):
+    """Shared checks for a paginated (status, data, headers) result; returns (data, headers)."""
+    status, data, headers = result
+    assert status == 200
+    assert _hi(headers, "x-page") == expected_page
+    assert _hi(headers, "x-page-size") == expected_size
+    assert len(data) <= expected_size
+    return data, headers
+
 
-    total = int(headers["X-Total-Count"]) if headers["X-Total-Count"].isdigit() else int(float(headers["X-Total-Count"]))
-    page = int(headers["X-Page"]) if headers["X-Page"].isdigit() else int(float(headers["X-Page"]))
-    size = int(headers["X-Page-Size"]) if headers["X-Page-Size"].isdigit() else int(float(headers["X-Page-Size"]))
-    total_pages = int(headers["X-Total-Pages"]) if headers["X-Total-Pages"].isdigit() else int(float(headers["X-Total-Pages"]))
+def test_pagination_headers_and_count(get_airports):
+    data, headers = _assert_page_shape(get_airports(size=5), 1, 5)
+    assert isinstance(data, list)
 
-    assert page == 1
-    assert size == 5
-    assert total_pages == (total + size - 1) // size
+    total = _hi(headers, "x-total-count")
+    assert _hi(headers, "x-total-pages") == (total + 5 - 1) // 5
 
 
-def test_pagination_pages_disjoint():
-    resp1 = client.get("/api/airports", params={"size": 5, "page": 1})
-    resp2 = client.get("/api/airports", params={"size": 5, "page": 2})
+async def test_pagination_pages_disjoint(asgi_transport):
+    # Request both pages concurrently over the in-process ASGI transport
+    async with httpx.AsyncClient(transport=asgi_transport, base_url="http://test") as c:
+        resp1, resp2 = await asyncio.gather(
+            c.get("/api/airports", params={"size": 5, "page": 1}),
+            c.get("/api/airports", params={"size": 5, "page": 2}),
+        )
     assert resp1.status_code == 200
     assert resp2.status_code == 200
 
-    data1 = resp1.json()
-    data2 = resp2.json()
+    data1 = orjson.loads(resp1.content)
+    data2 = orjson.loads(resp2.content)
+
+    ids1 = frozenset(str(a.get("id") or a.get("ident")) for a in data1)
 
-    ids1 = {str(a.get("id") or a.get("ident")) for a in data1}
-    ids2 = {str(a.get("id") or a.get("ident")) for a in data2}
+    # Pages should not overlap; isdisjoint stops at the first shared id
+    assert ids1.isdisjoint(str(a.get("id") or a.get("ident")) for a in data2)
 
-    # Pages should not overlap
-    assert ids1.isdisjoint(ids2)
 
+@pytest.fixture(scope="module")
+def has_us(get_airports):
+    """Skip tests that need US airports when the dataset has none."""
+    _status, _data, headers = get_airports(iso_country="US", size=1)
+    if headers.get("x-total-count", "0") == "0":
+        pytest.skip("no US rows")
 
-def test_pagination_with_filter_and_size():
-    resp = client.get("/api/airports", params={"iso_country": "US", "size": 3})
-    assert resp.status_code == 200
-    data = resp.json()
-    assert 0 <= len(data) <= 3
 
-    # All returned items should respect the filter
-    assert all((a.get("iso_country") or "").lower() == "us" for a in data)
+def test_pagination_with_filter_and_size(get_airports, has_us):
+    data, _headers = _assert_page_shape(get_airports(iso_country="US", size=3), 1, 3)
 
-    headers = resp.headers
-    assert headers.get("X-Page") == "1"
-    assert headers.get("X-Page-Size") == "3"
+    # All returned items should respect the filter (NOCASE: any case of "US")
+    assert all(a["iso_country"].upper() == "US" for a in data)
 
 
-def test_size_overrides_limit_when_both_provided():
-    resp = client.get("/api/airports", params={"size": 2, "limit": 1})
-    assert resp.status_code == 200
-    data = resp.json()
-    assert len(data) <= 2
+def test_size_overrides_limit_when_both_provided(get_airports):
+    data, _headers = _assert_page_shape(get_airports(size=2, limit=1), 1, 2)
     # Ensure that size takes precedence over limit and we can receive up to 2 items
-    assert len(data) == 2 or len(data) == 1  # Allow 1 if dataset is very small
\ No newline at end of file
+    n = len(data)
+    assert 1 <= n <= 2  # Allow 1 if dataset is very small
+
+
+def test_cursor_pagination_follows_next_cursor(get_airports):
+    status, data1, headers1 = get_airports(cursor="", size=3)
+    assert status == 200
+    assert len(data1) <= 3
+    assert "x-total-count" not in headers1
+
+    next_cursor = headers1.get("x-next-cursor")
+    if next_cursor is None:
+        return  # dataset fits in a single page
+    status, data2, _headers = get_airports(cursor=next_cursor, size=3)
+    assert status == 200
+    assert all(a["id"] > data1[-1]["id"] for a in data2)
+
+
+def test_invalid_cursor_rejected(get_airports):
+    status, _data, _headers = get_airports(cursor="not-a-cursor!")
+    assert status == 400
+
+
+def test_negative_cursor_rejected(get_airports):
+    # A negative id would otherwise silently restart from the first page
+    status, _data, _headers = get_airports(cursor=encode_cursor(-5))
+    assert status == 400
@@ -0,0 +1,70 @@
+"""Tests for the in-memory RateLimiterMiddleware."""
+
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.core.rate_limit import RateLimiterMiddleware
+
+
+async def _noop_app(scope, receive, send):
+    pass
+
+
+def _scope(headers=(), client=("10.0.0.1", 1234)):
+    return {"type": "http", "path": "/api/x", "headers": list(headers), "client": client}
+
+
+def test_client_id_uses_forwarded_header():
+    mw = RateLimiterMiddleware(_noop_app, header_client_ip="X-Forwarded-For")
+    scope = _scope([(b"x-forwarded-for", b"203.0.113.7, 10.0.0.2")])
+    assert mw._client_id(scope) == "203.0.113.7"
+
+
+def test_client_id_blank_forwarded_header_falls_back_to_peer():
+    mw = RateLimiterMiddleware(_noop_app, header_client_ip="X-Forwarded-For")
+    assert mw._client_id(_scope([(b"x-forwarded-for", b" ")])) == "10.0.0.1"
+    assert mw._client_id(_scope([(b"x-forwarded-for", b", 10.0.0.2")])) == "10.0.0.1"
+    assert mw._client_id(_scope([(b"x-forwarded-for", b"")], client=None)) == "anonymous"
+
+
+def _limited_client(limit=2):
+    async def ok(request):
+        return PlainTextResponse("ok")
+
+    app = Starlette(routes=[Route("/api/x", ok), Route("/about", ok)])
+    # A day-long window so the test never straddles a window boundary
+    app.add_middleware(RateLimiterMiddleware, limit=limit, window_seconds=86400, scope_prefix="/api")
+    return TestClient(app)
+
+
+def test_responses_carry_rate_limit_headers():
+    client = _limited_client(limit=2)
+    first = client.get("/api/x")
+    assert first.status_code == 200
+    assert first.headers["x-ratelimit-limit"] == "2"
+    assert first.headers["x-ratelimit-remaining"] == "1"
+    assert client.get("/api/x").headers["x-ratelimit-remaining"] == "0"
+
+
+def test_over_limit_returns_429_with_retry_after():
+    client = _limited_client(limit=2)
+    for _ in range(2):
+        assert client.get("/api/x").status_code == 200
+    resp = client.get("/api/x")
+    assert resp.status_code == 429
+    assert resp.json() == {"detail": "Too Many Requests"}
+    assert resp.headers["x-ratelimit-remaining"] == "0"
+    assert 1 <= int(resp.headers["retry-after"]) <= 86400
+
+
+def test_paths_outside_scope_are_not_counted():
+    client = _limited_client(limit=1)
+    for _ in range(3):
+        resp = client.get("/about")
+        assert resp.status_code == 200
+        assert "x-ratelimit-limit" not in resp.headers
+    # The out-of-scope requests didn't use up the API budget
+    assert client.get("/api/x").status_code == 200
+    assert client.get("/api/x").status_code == 429
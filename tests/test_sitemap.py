@@ -0,0 +1,62 @@
+"""Tests for /sitemap.xml and its in-process cache."""
+
+from fastapi.testclient import TestClient
+
+from app.api import public
+from main import app
+
+
+def test_sitemap_cache_is_bounded(client):
+    public._SITEMAP_CACHE.clear()
+    for i in range(public._SITEMAP_CACHE_SIZE + 3):
+        resp = client.get("/sitemap.xml", headers={"Host": f"host{i}.example"})
+        assert resp.status_code == 200
+    assert len(public._SITEMAP_CACHE) == public._SITEMAP_CACHE_SIZE
+    # The least recently used bases were evicted
+    assert "http://host0.example" not in public._SITEMAP_CACHE
+    assert f"http://host{public._SITEMAP_CACHE_SIZE + 2}.example" in public._SITEMAP_CACHE
+
+
+def test_sitemap_lists_pages_and_airports(client):
+    public._SITEMAP_CACHE.clear()
+    resp = client.get("/sitemap.xml")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/xml")
+    body = resp.text
+    assert body.startswith('<?xml version="1.0" encoding="UTF-8"?>')
+    assert body.rstrip().endswith("</urlset>")
+    assert "<loc>http://testserver/about</loc>" in body
+    assert "<loc>http://testserver/airports/" in body
+    # Served from the cache the second time, byte for byte
+    assert client.get("/sitemap.xml").content == resp.content
+
+
+def test_iter_sitemap_closes_its_connection(monkeypatch):
+    opened = []
+
+    class _Conn:
+        def __init__(self):
+            self.closed = False
+
+        def execute(self, sql):
+            raise RuntimeError("boom")
+
+        def close(self):
+            self.closed = True
+
+    def _open():
+        opened.append(_Conn())
+        return opened[-1]
+
+    monkeypatch.setattr(public, "open_connection", _open)
+    xml = b"".join(public._iter_sitemap("http://h"))
+    assert xml.endswith(b"</urlset>")
+    assert len(opened) == 1 and opened[0].closed
+
+
+def test_sitemap_works_from_separate_event_loops():
+    # Each TestClient runs its own loop; the rebuild lock must not be tied to one
+    for _ in range(2):
+        public._SITEMAP_CACHE.clear()
+        with TestClient(app) as c:
+            assert c.get("/sitemap.xml").status_code == 200